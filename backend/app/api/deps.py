@@ -1,11 +1,14 @@
-from typing import Iterable
+import secrets
+from typing import Iterable, Optional
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError
 
+from app.core.config import settings
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models import User
 
 bearer = HTTPBearer(auto_error=True)
@@ -27,6 +30,24 @@ def get_current_user(
         raise HTTPException(status_code=401, detail="invalid token")
 
 
+async def get_current_user_async(
+    cred: HTTPAuthorizationCredentials = Depends(bearer),
+    db: AsyncSession = Depends(get_async_db),
+) -> User:
+    """get_current_user for async routes (no threadpool hop for the lookup)."""
+    try:
+        payload = decode_token(cred.credentials)
+        sub = payload.get("sub")
+        if not sub:
+            raise HTTPException(status_code=401, detail="invalid token")
+        user = await db.get(User, int(sub))
+        if not user:
+            raise HTTPException(status_code=401, detail="user not found")
+        return user
+    except JWTError:
+        raise HTTPException(status_code=401, detail="invalid token")
+
+
 def require_roles(*allowed: Iterable[str]):
     def checker(current_user: User = Depends(get_current_user)):
         if current_user.role.value not in allowed:
@@ -36,3 +57,12 @@ def require_roles(*allowed: Iterable[str]):
 
 # Example usage:
 # @router.post("/crops", dependencies=[Depends(require_roles("seller","admin"))])
+
+
+metrics_bearer = HTTPBearer(auto_error=False)
+
+def require_metrics_token(cred: Optional[HTTPAuthorizationCredentials] = Depends(metrics_bearer)) -> None:
+    """/metrics is for the Prometheus scraper only: Bearer METRICS_TOKEN, closed when unset."""
+    token = settings.metrics_token
+    if not token or cred is None or not secrets.compare_digest(cred.credentials, token):
+        raise HTTPException(status_code=403, detail="forbidden")
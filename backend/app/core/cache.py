@@ -0,0 +1,155 @@
+# app/core/cache.py
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    """Small thread-safe LRU whose entries also expire after `ttl` seconds."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return default
+            expires_at, value = hit
+            if expires_at <= now:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# ----------------------------------------------------------------------
+# Versioned response cache
+#
+# Entries are keyed by (namespace, parts, versions of the tables they read).
+# Committed writes to a tracked table bump its version (see
+# app/db/versioning.py), so older entries simply stop being addressed and
+# age out of the LRU. Writes that bypass the ORM session (raw SQL, other
+# processes with the memory backend) are bounded by the TTL.
+
+class MemoryCacheBackend:
+    """Per-process LRU + TTL entries and version counters (the default)."""
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 30.0) -> None:
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        return self._entries.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._entries.set(key, value, ttl)
+
+    def bump(self, name: str) -> None:
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+
+    def versions(self, names: tuple[str, ...]) -> tuple[int, ...]:
+        return tuple(self._versions.get(n, 0) for n in names)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """Shared backend for multi-worker deployments (needs the `redis` package)."""
+
+    def __init__(self, url: str, ttl: float = 30.0, prefix: str = "mahaseel:cache:") -> None:
+        import redis  # optional dependency, only needed when CACHE_URL is set
+
+        self._r = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self._r.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self._r.set(self.prefix + key, json.dumps(value), ex=max(1, int(ttl or self.ttl)))
+
+    def bump(self, name: str) -> None:
+        self._r.incr(self.prefix + "v:" + name)
+
+    def versions(self, names: tuple[str, ...]) -> tuple[int, ...]:
+        vals = self._r.mget([self.prefix + "v:" + n for n in names])
+        return tuple(int(v or 0) for v in vals)
+
+    def clear(self) -> None:
+        for k in self._r.scan_iter(self.prefix + "*"):
+            self._r.delete(k)
+
+
+class ResponseCache:
+    def __init__(self, backend, enabled: bool = True) -> None:
+        self.backend = backend
+        self.enabled = enabled
+
+    def key(self, namespace: str, parts: Hashable, tables: tuple[str, ...]) -> str:
+        versions = self.backend.versions(tables)
+        digest = hashlib.sha1(repr((parts, versions)).encode()).hexdigest()
+        return f"{namespace}:{digest}"
+
+    def get(self, key: str) -> Any:
+        if not self.enabled:
+            return MISSING
+        return self.backend.get(key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if self.enabled:
+            self.backend.set(key, value, ttl)
+
+    def bump(self, *tables: str) -> None:
+        for t in tables:
+            self.backend.bump(t)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+def _build_response_cache() -> ResponseCache:
+    from app.core.config import settings
+
+    if settings.cache_url:
+        backend = RedisCacheBackend(settings.cache_url, ttl=settings.response_cache_ttl_seconds)
+    else:
+        backend = MemoryCacheBackend(
+            maxsize=settings.response_cache_size, ttl=settings.response_cache_ttl_seconds
+        )
+    return ResponseCache(backend, enabled=settings.response_cache_enabled)
+
+
+# Shared singleton instance
+response_cache = _build_response_cache()
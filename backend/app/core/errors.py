@@ -11,6 +11,7 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content=error_payload(exc.status_code, "HTTPException", str(exc.detail)),
+        headers=getattr(exc, "headers", None),  # e.g. Retry-After on 429
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
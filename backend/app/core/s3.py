@@ -0,0 +1,121 @@
+# app/core/s3.py
+"""
+Process-wide S3 client.
+
+boto3 clients are thread-safe and expensive to build (credential chain,
+endpoint resolution, a fresh urllib3 pool), so one is built lazily and
+shared by every request and upload thread. Its connection pool is sized
+by S3_MAX_POOL_CONNECTIONS; keep it >= the threads that use it at once
+(UPLOAD_THREADPOOL_SIZE x S3_MAX_CONCURRENCY) or they queue for sockets.
+
+Objects above S3_MULTIPART_THRESHOLD_MB go up as multipart uploads with
+S3_MAX_CONCURRENCY parts in flight; small ones are a single PUT. Several
+objects (an image's derivatives) are uploaded concurrently by `put_many`,
+and deletes are batched through DeleteObjects. S3_ENDPOINT_URL points all
+of it at an S3-compatible server (MinIO locally).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import BinaryIO, Iterable, Optional, Union
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+from app.core.config import settings
+
+log = logging.getLogger("mahaseel")
+
+MB = 1024 * 1024
+DELETE_BATCH = 1000  # DeleteObjects limit
+
+_lock = threading.Lock()
+_client = None
+_transfer: Optional[TransferConfig] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_s3_client():
+    global _client, _transfer
+    if _client is None:
+        with _lock:
+            if _client is None:
+                config = Config(
+                    max_pool_connections=settings.s3_max_pool_connections,
+                    retries={"max_attempts": 3, "mode": "standard"},
+                    connect_timeout=5,
+                    read_timeout=30,
+                    tcp_keepalive=True,
+                )
+                _transfer = TransferConfig(
+                    multipart_threshold=settings.s3_multipart_threshold_mb * MB,
+                    multipart_chunksize=settings.s3_multipart_chunk_mb * MB,
+                    max_concurrency=settings.s3_max_concurrency,
+                )
+                _client = boto3.session.Session().client(
+                    "s3",
+                    endpoint_url=settings.s3_endpoint_url or None,
+                    region_name=settings.s3_region or None,
+                    config=config,
+                )
+    return _client
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=settings.s3_max_concurrency, thread_name_prefix="s3-put")
+    return _executor
+
+
+def reset_s3_client() -> None:
+    """Drop the shared client (tests, or after changing S3_* settings)."""
+    global _client, _transfer
+    with _lock:
+        _client, _transfer = None, None
+
+
+def put_object(key: str, body: Union[bytes, BinaryIO], content_type: str, bucket: Optional[str] = None) -> None:
+    client = get_s3_client()
+    bucket = bucket or settings.s3_bucket
+    if isinstance(body, bytes) and len(body) < _transfer.multipart_threshold:
+        # one PUT; upload_fileobj would spin up a transfer manager for nothing
+        client.put_object(Bucket=bucket, Key=key, Body=body, ContentType=content_type)
+        return
+    fileobj = BytesIO(body) if isinstance(body, bytes) else body
+    client.upload_fileobj(fileobj, bucket, key, ExtraArgs={"ContentType": content_type}, Config=_transfer)
+
+
+def put_many(objects: Iterable[tuple[str, Union[bytes, BinaryIO], str]], bucket: Optional[str] = None) -> None:
+    """Upload (key, body, content_type) objects concurrently; raises the first failure."""
+    objects = list(objects)
+    if len(objects) <= 1:
+        for key, body, content_type in objects:
+            put_object(key, body, content_type, bucket)
+        return
+    futures = [_get_executor().submit(put_object, key, body, ct, bucket) for key, body, ct in objects]
+    for f in futures:
+        f.result()
+
+
+def delete_objects(keys: Iterable[str], bucket: Optional[str] = None) -> list[str]:
+    """Batch delete (1000 keys per request). Returns the keys S3 reported as failed."""
+    keys = list(dict.fromkeys(k for k in keys if k))
+    client = get_s3_client()
+    failed: list[str] = []
+    for i in range(0, len(keys), DELETE_BATCH):
+        chunk = keys[i:i + DELETE_BATCH]
+        resp = client.delete_objects(
+            Bucket=bucket or settings.s3_bucket,
+            Delete={"Objects": [{"Key": k} for k in chunk], "Quiet": True},
+        )
+        for err in resp.get("Errors", []):
+            log.warning("s3 delete failed", extra={"key": err.get("Key"), "code": err.get("Code")})
+            failed.append(err.get("Key"))
+    return failed
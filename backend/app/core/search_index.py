@@ -0,0 +1,180 @@
+# app/core/search_index.py
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+log = logging.getLogger("mahaseel")
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class CropSearchIndex:
+    """
+    In-process inverted trigram index over crops.search_text.
+
+    Consistency rule: writes made by *this* process (create_crop /
+    create_crop_upload) are visible immediately; writes from other workers,
+    edits and deletes are picked up by the next rebuild, which happens in
+    the background once the index is older than `max_age` seconds (or on
+    POST /admin/search-index/rebuild). Candidates only narrow the rows:
+    apply_filters re-checks the substring in SQL on that set, so deleted or
+    edited crops are never returned on stale text - the worst case is a
+    missed match (new text not indexed yet) until the next rebuild. The
+    index answers substring matches only; on Postgres the full-text half of
+    search_filter still runs in SQL.
+
+    Queries with more than `max_candidates` hits fall back to SQL: an IN
+    list that long costs more than the trigram index it would replace.
+    """
+
+    def __init__(self, max_age: float = 300.0, max_candidates: int = 5000) -> None:
+        self.max_age = max_age
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        self._postings: dict[str, set[int]] = {}
+        self._docs: dict[int, str] = {}
+        self._built_at: Optional[float] = None
+        # bumped by mark_stale(); a snapshot is fresh only if built after the last bump
+        self._generation = 0
+        self._built_generation = 0
+
+    # ------------------------------------------------------------------
+    # internal helpers
+    def _add_locked(self, crop_id: int, text: str) -> None:
+        self._remove_locked(crop_id)
+        self._docs[crop_id] = text
+        for g in trigrams(text):
+            self._postings.setdefault(g, set()).add(crop_id)
+
+    def _remove_locked(self, crop_id: int) -> None:
+        old = self._docs.pop(crop_id, None)
+        if old is None:
+            return
+        for g in trigrams(old):
+            ids = self._postings.get(g)
+            if ids is not None:
+                ids.discard(crop_id)
+                if not ids:
+                    del self._postings[g]
+
+    # ------------------------------------------------------------------
+    # public API
+    @property
+    def ready(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._built_at is None
+            or self._built_generation != self._generation
+            or time.monotonic() - self._built_at > self.max_age
+        )
+
+    def mark_stale(self) -> None:
+        """For writes that bypass add() (bulk import): the next refresh() rebuilds."""
+        with self._lock:
+            self._generation += 1
+
+    def rebuild(self, db: Session) -> int:
+        from app.models import Crop  # lazy import to avoid cycles
+
+        generation = self._generation
+        rows = db.execute(select(Crop.id, Crop.search_text)).all()
+        postings: dict[str, set[int]] = {}
+        docs: dict[int, str] = {}
+        for crop_id, text in rows:
+            text = text or ""
+            docs[crop_id] = text
+            for g in trigrams(text):
+                postings.setdefault(g, set()).add(crop_id)
+        with self._lock:
+            self._postings, self._docs = postings, docs
+            self._built_at = time.monotonic()
+            self._built_generation = generation
+        log.info("crop search index rebuilt", extra={"docs": len(docs), "trigrams": len(postings)})
+        return len(docs)
+
+    def refresh(self) -> Optional[threading.Thread]:
+        """
+        Rebuild on a background thread with its own session if stale. Never
+        blocks the caller (which may be on the event loop, via run_sync):
+        candidates() returns None - the SQL fallback - until the new snapshot
+        is in. Returns the rebuild thread, if one was started.
+        """
+        if not self.stale or not self._rebuild_lock.acquire(blocking=False):
+            return None
+
+        def run() -> None:
+            from app.db.session import get_session_factory  # lazy import to avoid cycles
+
+            session = get_session_factory()()
+            try:
+                self.rebuild(session)
+            except Exception:
+                log.exception("crop search index rebuild failed")
+            finally:
+                session.close()
+                self._rebuild_lock.release()
+
+        thread = threading.Thread(target=run, name="crop-search-rebuild", daemon=True)
+        thread.start()
+        return thread
+
+    def add(self, crop_id: int, text: Optional[str]) -> None:
+        if not self.ready:
+            return
+        with self._lock:
+            self._add_locked(crop_id, text or "")
+
+    def remove(self, crop_id: int) -> None:
+        with self._lock:
+            self._remove_locked(crop_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings, self._docs = {}, {}
+            self._built_at = None
+
+    def candidates(self, q_norm: str) -> Optional[set[int]]:
+        """
+        IDs whose search_text contains `q_norm`, or None when the caller
+        should fall back to SQL (index cold/stale, query shorter than a
+        trigram, or too many hits to pass as an IN list).
+        """
+        grams = trigrams(q_norm)
+        if not grams or self.stale:
+            return None
+        with self._lock:
+            lists = [self._postings.get(g) for g in grams]
+            if any(ids is None for ids in lists):
+                return set()
+            lists.sort(key=len)
+            out = set(lists[0])
+            for ids in lists[1:]:
+                out &= ids
+                if not out:
+                    return out
+            # trigrams only prove co-occurrence; confirm the substring
+            out = {i for i in out if q_norm in self._docs.get(i, "")}
+        if len(out) > self.max_candidates:
+            return None
+        return out
+
+
+# Shared singleton instance
+crop_search_index = CropSearchIndex(
+    max_age=settings.search_index_max_age_seconds,
+    max_candidates=settings.search_index_max_candidates,
+)
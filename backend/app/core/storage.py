@@ -0,0 +1,97 @@
+# app/core/storage.py
+"""
+Where media bytes live. MEDIA_BACKEND picks the backend:
+
+- local: files under UPLOAD_DIR, served by the app at STATIC_URL (/static).
+- s3:    objects in S3_BUCKET through the shared client (app/core/s3.py),
+         served from CDN_BASE_URL, the S3 endpoint or the bucket's URL.
+
+Both take keys relative to their root ("media/ab/ab12....jpg") and have the
+same four methods; Media.path / Media.variants store keys, never URLs.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable
+
+from app.core.config import settings
+
+log = logging.getLogger("mahaseel")
+
+
+class LocalStorageBackend:
+    def __init__(self, root: str, base_url: str = "/static") -> None:
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    def _path(self, key: str) -> Path:
+        path = (self.root / key.lstrip("/")).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"key outside storage root: {key}")
+        return path
+
+    def put_many(self, objects: Iterable[tuple[str, bytes, str]]) -> None:
+        for key, body, _content_type in objects:
+            path = self._path(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # write-then-rename: readers never see a half-written file
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.replace(tmp, path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+
+    def delete(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            try:
+                self._path(key).unlink(missing_ok=True)
+            except (OSError, ValueError):
+                log.warning("media delete failed", extra={"key": key})
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key.lstrip('/')}"
+
+
+class S3StorageBackend:
+    def __init__(self, bucket: str, public_base_url: str = "") -> None:
+        self.bucket = bucket
+        self.public_base_url = public_base_url.rstrip("/")
+
+    def put_many(self, objects: Iterable[tuple[str, bytes, str]]) -> None:
+        from app.core import s3
+
+        s3.put_many(objects, bucket=self.bucket)
+
+    def delete(self, keys: Iterable[str]) -> None:
+        from app.core import s3
+
+        s3.delete_objects(keys, bucket=self.bucket)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_base_url}/{key.lstrip('/')}"
+
+
+def _s3_public_base() -> str:
+    if settings.cdn_base_url:
+        return settings.cdn_base_url
+    if settings.s3_endpoint_url:
+        return f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}"
+    return f"https://{settings.s3_bucket}.s3.amazonaws.com"
+
+
+def build_media_storage():
+    if settings.media_backend == "s3":
+        if not settings.s3_bucket:
+            raise RuntimeError("MEDIA_BACKEND=s3 needs S3_BUCKET")
+        return S3StorageBackend(settings.s3_bucket, _s3_public_base())
+    return LocalStorageBackend(settings.upload_dir, settings.static_url)
+
+
+# Shared singleton instance
+media_storage = build_media_storage()
@@ -0,0 +1,146 @@
+# app/core/suggest_index.py
+from __future__ import annotations
+
+import heapq
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.utils.text import normalize_ar
+
+log = logging.getLogger("mahaseel")
+
+# upper bound of every key starting with a given prefix
+_PREFIX_END = "\U0010ffff"
+
+
+class CropSuggestIndex:
+    """
+    In-process prefix index over crop names and types for search-as-you-type.
+
+    Terms are normalized with normalize_ar (same as `q` and search_text) and
+    stored as a sorted array of keys - one per word start, so "حمراء" finds
+    "طماطم حمراء" - searched with bisect. Each term carries its listing count,
+    which ranks the suggestions.
+
+    Requests never wait on the database once the index is built: a stale
+    index keeps serving while a background thread rebuilds it. Only the very
+    first call in a worker builds synchronously.
+    """
+
+    def __init__(self, max_age: float = 60.0) -> None:
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.Lock()
+        # parallel arrays, sorted by key
+        self._keys: list[str] = []
+        self._refs: list[int] = []
+        # term id -> (text, kind, count)
+        self._terms: list[tuple[str, str, int]] = []
+        self._built_at: Optional[float] = None
+        # bumped by mark_stale(); a snapshot is fresh only if built after the last bump
+        self._generation = 0
+        self._built_generation = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._built_at is not None
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._built_at is None
+            or self._built_generation != self._generation
+            or time.monotonic() - self._built_at > self.max_age
+        )
+
+    def mark_stale(self) -> None:
+        """For writes that bypass add() (bulk import): the next refresh() rebuilds."""
+        with self._lock:
+            self._generation += 1
+
+    def rebuild(self, db: Session) -> int:
+        from app.models import Crop  # lazy import to avoid cycles
+
+        generation = self._generation
+        terms: list[tuple[str, str, int]] = []
+        for kind, col in (("name", Crop.name), ("type", Crop.type)):
+            counts: Counter = Counter()
+            spellings: dict[str, Counter] = {}
+            for text, n in db.execute(select(col, func.count()).where(col.isnot(None)).group_by(col)):
+                norm = normalize_ar(text)
+                if not norm:
+                    continue
+                counts[norm] += n
+                spellings.setdefault(norm, Counter())[text.strip()] += n
+            # variants that normalize alike are one suggestion, shown in the commonest spelling
+            terms.extend((spellings[norm].most_common(1)[0][0], kind, n) for norm, n in counts.items())
+
+        pairs = []
+        for ref, (text, _, _) in enumerate(terms):
+            words = normalize_ar(text).split()
+            pairs.extend((" ".join(words[i:]), ref) for i in range(len(words)))
+        pairs.sort()
+
+        with self._lock:
+            self._keys = [k for k, _ in pairs]
+            self._refs = [r for _, r in pairs]
+            self._terms = terms
+            self._built_at = time.monotonic()
+            self._built_generation = generation
+        log.info("crop suggest index rebuilt", extra={"terms": len(terms), "keys": len(pairs)})
+        return len(terms)
+
+    def refresh(self, db: Session) -> None:
+        """Cold: build now with `db`. Stale: rebuild on a background thread with its own session."""
+        if not self.stale or not self._rebuild_lock.acquire(blocking=False):
+            return
+        if not self.ready:
+            try:
+                self.rebuild(db)
+            finally:
+                self._rebuild_lock.release()
+            return
+
+        def run() -> None:
+            from app.db.session import get_session_factory  # lazy import to avoid cycles
+
+            session = get_session_factory()()
+            try:
+                self.rebuild(session)
+            except Exception:
+                # keep serving the old snapshot; the next call retries
+                log.exception("crop suggest index rebuild failed")
+            finally:
+                session.close()
+                self._rebuild_lock.release()
+
+        threading.Thread(target=run, name="crop-suggest-rebuild", daemon=True).start()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys, self._refs, self._terms = [], [], []
+            self._built_at = None
+
+    def suggest(self, prefix_norm: str, limit: int = 10) -> list[dict]:
+        """Top `limit` terms with a word starting with `prefix_norm` (already normalize_ar()'d)."""
+        if not prefix_norm:
+            return []
+        with self._lock:
+            keys, refs, terms = self._keys, self._refs, self._terms
+        lo = bisect_left(keys, prefix_norm)
+        hi = bisect_left(keys, prefix_norm + _PREFIX_END, lo)
+        hits = {refs[i] for i in range(lo, hi)}
+        best = heapq.nsmallest(limit, hits, key=lambda r: (-terms[r][2], terms[r][0]))
+        return [{"text": terms[r][0], "kind": terms[r][1], "count": terms[r][2]} for r in best]
+
+
+# Shared singleton instance
+crop_suggest_index = CropSuggestIndex(max_age=settings.suggest_index_max_age_seconds)
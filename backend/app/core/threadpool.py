@@ -0,0 +1,76 @@
+# app/core/threadpool.py
+"""
+Thread capacity for blocking work, split so uploads can't starve browsing.
+
+- Sync `def` handlers and dependencies run on AnyIO's default thread
+  limiter. Its size is THREADPOOL_SIZE, or by default the sync DB pool's
+  capacity (DB_POOL_SIZE + DB_MAX_OVERFLOW) plus THREADPOOL_HEADROOM for
+  handlers that never touch the database: more threads than connections
+  would only queue inside the pool.
+- File / upload I/O goes through `run_io`, on its own limiter
+  (UPLOAD_THREADPOOL_SIZE). Read UploadFile via `run_io(f.file.read)`, not
+  `await f.read()`, which borrows from the default limiter.
+- CPU-heavy image work has its own spawn-based process pool
+  (app/services/image_pipeline.py).
+
+Queue depth of each is published on /metrics (threadpool_* gauges).
+"""
+from __future__ import annotations
+
+import functools
+from typing import Callable, TypeVar
+
+import anyio.to_thread
+from anyio import CapacityLimiter
+from prometheus_client import REGISTRY
+from prometheus_client.core import GaugeMetricFamily
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+_limiters: dict[str, CapacityLimiter] = {}
+
+
+def default_threadpool_size() -> int:
+    if settings.threadpool_size > 0:
+        return settings.threadpool_size
+    return settings.db_pool_size + settings.db_max_overflow + settings.threadpool_headroom
+
+
+def configure_threadpools() -> None:
+    """Call on startup, inside the event loop (limiters are per loop)."""
+    default = anyio.to_thread.current_default_thread_limiter()
+    default.total_tokens = default_threadpool_size()
+    _limiters["default"] = default
+    _limiters["io"] = CapacityLimiter(settings.upload_threadpool_size)
+
+
+def _io_limiter() -> CapacityLimiter:
+    limiter = _limiters.get("io")
+    if limiter is None:
+        # not started through the app (scripts, bare tests)
+        limiter = _limiters["io"] = CapacityLimiter(settings.upload_threadpool_size)
+    return limiter
+
+
+async def run_io(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Blocking file/network I/O on the upload limiter."""
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=_io_limiter())
+
+
+class _ThreadpoolCollector:
+    def collect(self):
+        size = GaugeMetricFamily("threadpool_size", "Thread limiter capacity", labels=["pool"])
+        busy = GaugeMetricFamily("threadpool_busy", "Threads currently borrowed", labels=["pool"])
+        waiting = GaugeMetricFamily("threadpool_waiting", "Tasks queued for a thread", labels=["pool"])
+        for name, limiter in list(_limiters.items()):
+            size.add_metric([name], limiter.total_tokens)
+            busy.add_metric([name], limiter.borrowed_tokens)
+            waiting.add_metric([name], limiter.statistics().tasks_waiting)
+        yield size
+        yield busy
+        yield waiting
+
+
+REGISTRY.register(_ThreadpoolCollector())
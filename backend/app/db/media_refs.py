@@ -0,0 +1,83 @@
+# app/db/media_refs.py
+"""
+Keeps MediaBlob.refcount in step with Media rows however they are deleted:
+DELETE /media/{id}, or the ORM cascade from a deleted crop or user. When a
+blob's last reference goes, its row is dropped in the same flush and its
+objects are deleted from storage (best-effort) once the session commits.
+
+Each blob row has its own object keys (see app/services/media_ingest.py
+`blob_stem`), so purging a released blob never touches the objects of a
+newer upload of the same bytes.
+
+The reverse holds too: objects stored for a new blob are tracked on the
+session (`track_stored`) until it commits, and deleted if the transaction
+ends any other way (rollback, or the request's session closing on an
+error), so a blob row that never lands leaves no orphans in storage.
+"""
+from sqlalchemy import delete, event, update
+from sqlalchemy.orm import Session, object_session
+
+from app.models.media import Media, MediaBlob
+from app.services.media_service import delete_media_objects, media_keys
+
+_KEY = "media_purge"
+_STORED = "media_stored"
+
+
+def track_stored(session: Session, keys: list[str]) -> None:
+    """Objects just written for a blob row this session hasn't committed yet."""
+    session.info.setdefault(_STORED, []).extend(keys)
+
+
+def untrack_stored(session: Session, keys: list[str]) -> None:
+    pending = session.info.get(_STORED, [])
+    session.info[_STORED] = [k for k in pending if k not in keys]
+
+
+@event.listens_for(Media, "after_delete")
+def _release(mapper, connection, target):
+    keys = media_keys(target)
+    if target.content_hash is not None:
+        connection.execute(
+            update(MediaBlob.__table__)
+            .where(MediaBlob.hash == target.content_hash)
+            .values(refcount=MediaBlob.refcount - 1)
+        )
+        gone = connection.execute(
+            delete(MediaBlob.__table__)
+            .where(MediaBlob.hash == target.content_hash, MediaBlob.refcount <= 0)
+        ).rowcount
+        if not gone:
+            return
+    # rows stored before content addressing own their objects outright
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_KEY, []).extend(keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _purge(session):
+    if session.in_nested_transaction():
+        # a savepoint (media_ingest._register_blob); fires after_commit too
+        return
+    # stored objects now belong to committed blob rows
+    session.info.pop(_STORED, None)
+    keys = session.info.pop(_KEY, None)
+    if keys:
+        delete_media_objects(keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_orphans(session, transaction):
+    # fires for rollback and for close() alike (close doesn't emit
+    # after_soft_rollback); after a commit, _purge has already cleared the list
+    if transaction.parent is None:
+        keys = session.info.pop(_STORED, None)
+        if keys:
+            delete_media_objects(keys)
@@ -0,0 +1,86 @@
+# app/db/pool_metrics.py
+"""
+Prometheus metrics for the SQLAlchemy connection pools, served on /metrics
+next to the HTTP metrics. Checked-out / overflow / size are read from the
+engines' current pools at scrape time; checkout latency and the number of callers blocked
+on an exhausted pool come from the instrumented pool classes below, which
+wrap the public Pool.connect(). A pool at size + overflow with waiters and
+slow checkouts is exhaustion; slow requests with fast checkouts are slow
+queries.
+"""
+from time import perf_counter
+
+from prometheus_client import REGISTRY, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent getting a connection from the pool",
+    ["pool"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+WAITING = Gauge("db_pool_waiting", "Callers blocked on an exhausted pool", ["pool"])
+
+_engines: dict[str, Engine] = {}
+
+
+class _CheckoutTimer:
+    def __init__(self, creator, pool_size: int = 5, max_overflow: int = 10, **kw):
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        # max_overflow < 0 means unbounded: nobody ever waits
+        self.capacity = pool_size + max_overflow if max_overflow >= 0 else None
+        WAITING.labels(self.logging_name or "default")  # publish 0 before the first wait
+
+    def connect(self):
+        label = self.logging_name or "default"
+        # every connection is in use: this caller blocks until one comes back
+        blocked = self.capacity is not None and self.checkedout() >= self.capacity
+        if blocked:
+            WAITING.labels(label).inc()
+        start = perf_counter()
+        try:
+            return super().connect()
+        finally:
+            if blocked:
+                WAITING.labels(label).dec()
+            CHECKOUT_SECONDS.labels(label).observe(perf_counter() - start)
+
+
+class InstrumentedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def track_engine(name: str, engine: Engine) -> None:
+    """
+    Publish `engine`'s pool under `name`. The engine, not the pool, is kept:
+    dispose() swaps in a new pool, and the gauges must follow it. For an
+    AsyncEngine pass its sync_engine.
+    """
+    _engines[name] = engine
+
+
+class _PoolCollector:
+    def collect(self):
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open beyond pool_size", labels=["pool"])
+        size = GaugeMetricFamily("db_pool_size", "Configured pool_size", labels=["pool"])
+        for name, engine in list(_engines.items()):
+            pool = engine.pool
+            if not isinstance(pool, QueuePool):
+                continue
+            checked_out.add_metric([name], pool.checkedout())
+            # QueuePool counts up from -pool_size while the pool fills
+            overflow.add_metric([name], max(0, pool.overflow()))
+            size.add_metric([name], pool.size())
+        yield checked_out
+        yield overflow
+        yield size
+
+
+REGISTRY.register(_PoolCollector())
@@ -0,0 +1,113 @@
+# app/db/routing.py
+"""
+Read-your-writes for replica routing.
+
+ReadYourWritesMiddleware opens a write scope per request; app/db/versioning.py
+calls note_write() when a session in that request commits a write. The
+client is then pinned to the primary for REPLICA_STICKY_SECONDS, so its
+next reads can't come from a replica that hasn't caught up yet.
+
+Pins are kept apart from cached responses, so browse traffic can't evict
+them before they expire. With CACHE_URL they live in Redis and hold across
+workers; otherwise they are per process, and a client whose next request
+lands on another uvicorn worker may still read from a replica there.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from fastapi import Request
+from jose import JWTError
+
+from app.core.cache import MISSING, response_cache
+from app.core.config import settings
+from app.core.security import decode_token
+
+_write_scope: ContextVar[Optional[dict]] = ContextVar("db_write_scope", default=None)
+
+
+def client_identity(request: Request) -> str:
+    """The authenticated user when there is one, else the client address."""
+    auth = request.headers.get("authorization", "")
+    if auth.lower().startswith("bearer "):
+        try:
+            sub = decode_token(auth[7:].strip()).get("sub")
+            if sub:
+                return f"u:{sub}"
+        except JWTError:
+            pass
+    return f"ip:{request.client.host if request.client else '-'}"
+
+
+class PinStore:
+    """
+    Per-process identity -> expiry map. Unlike the response cache's LRU it
+    never drops a live pin; expired ones are swept out as new pins come in.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._until: dict[str, float] = {}
+        self._swept_at = time.monotonic()
+
+    def get(self, key: str):
+        until = self._until.get(key)
+        return 1 if until is not None and until > time.monotonic() else MISSING
+
+    def set(self, key: str, value, ttl: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + ttl
+            if now - self._swept_at > ttl:
+                self._until = {k: t for k, t in self._until.items() if t > now}
+                self._swept_at = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+def _build_pin_store():
+    if settings.cache_url:
+        # Redis entries expire by TTL only and are seen by every worker
+        return response_cache.backend
+    return PinStore()
+
+
+_pins = _build_pin_store()
+
+
+def _pin_key(identity: str) -> str:
+    return f"rw-pin:{identity}"
+
+
+def pin_to_primary(identity: str) -> None:
+    _pins.set(_pin_key(identity), 1, ttl=settings.replica_sticky_seconds)
+
+
+def pinned_to_primary(request: Request) -> bool:
+    return _pins.get(_pin_key(client_identity(request))) is not MISSING
+
+
+def clear_pins() -> None:
+    # with Redis, pins share the response cache's keyspace and go with its clear()
+    if isinstance(_pins, PinStore):
+        _pins.clear()
+
+
+def open_write_scope():
+    return _write_scope.set({"wrote": False})
+
+
+def close_write_scope(token) -> bool:
+    """Resets the scope; True if the request committed a write."""
+    scope = _write_scope.get()
+    _write_scope.reset(token)
+    return bool(scope and scope["wrote"])
+
+
+def note_write() -> None:
+    scope = _write_scope.get()
+    if scope is not None:
+        scope["wrote"] = True
@@ -1,9 +1,35 @@
+import itertools
+
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.core.config import settings
+from app.core.config import async_db_url, settings
+from app.db import media_refs, versioning  # noqa: F401  (registers blob-refcount and cache-version listeners)
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, track_engine
+from app.db.routing import pinned_to_primary
 
 _engine = None
 _SessionLocal = None
+_async_engine = None
+_AsyncSessionLocal = None
+
+def _engine_options(url: str, name: str, is_async: bool = False) -> dict:
+    """Pool/connection settings shared by every engine; `name` labels its pool metrics."""
+    opts = {"pool_pre_ping": True, "pool_logging_name": name}
+    if url.startswith("sqlite"):
+        # SQLite keeps SQLAlchemy's default pool for its URL kind (file vs :memory:)
+        return opts
+    opts.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if settings.db_statement_timeout_ms > 0 and url.startswith("postgresql"):
+        opts["connect_args"] = {"options": f"-c statement_timeout={settings.db_statement_timeout_ms}"}
+    return opts
 
 def _ensure_engine():
     global _engine, _SessionLocal
@@ -11,7 +37,8 @@ def _ensure_engine():
         url = settings.sqlalchemy_url
         if not url:
             raise RuntimeError("DATABASE_URL is not set/normalized")
-        _engine = create_engine(url, pool_pre_ping=True)
+        _engine = create_engine(url, **_engine_options(url, "primary"))
+        track_engine("primary", _engine)
         _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
 
 def get_engine():
@@ -29,3 +56,93 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# --- async (read-heavy endpoints) ---------------------------------------------
+# Waiting on the database doesn't hold a threadpool worker. Legacy Query code
+# runs unchanged through `await db.run_sync(fn, ...)`; new code can use
+# `await db.execute(select(...))`. Its own pool, sized like the sync one
+# (DB_POOL_SIZE / DB_MAX_OVERFLOW apply to each engine).
+
+def _ensure_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        url = settings.async_sqlalchemy_url
+        if not url:
+            raise RuntimeError("DATABASE_URL is not set/normalized")
+        _async_engine = create_async_engine(url, **_engine_options(url, "primary-async", is_async=True))
+        track_engine("primary-async", _async_engine.sync_engine)
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+
+def get_async_engine():
+    _ensure_async_engine()
+    return _async_engine
+
+async def get_async_db():
+    _ensure_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+# --- read replicas ---------------------------------------------------------------
+# get_read_db / get_async_read_db are for read-only endpoints: they hand out a
+# replica session (round robin over DATABASE_REPLICA_URLS) unless no replicas
+# are configured or the client just wrote (see app/db/routing.py), in which
+# case the primary session from get_db / get_async_db is used.
+
+_replica_makers: dict[str, sessionmaker] = {}
+_async_replica_makers: dict[str, async_sessionmaker] = {}
+_rr = itertools.count()
+
+def _replica_label(url: str) -> str:
+    return f"replica{settings.replica_sqlalchemy_urls.index(url)}"
+
+def _replica_url(request: Request):
+    urls = settings.replica_sqlalchemy_urls
+    if not urls:
+        return None
+    if pinned_to_primary(request):
+        request.state.pinned_to_primary = True
+        return None
+    return urls[next(_rr) % len(urls)]
+
+def _replica_maker(url: str) -> sessionmaker:
+    maker = _replica_makers.get(url)
+    if maker is None:
+        label = _replica_label(url)
+        engine = create_engine(url, **_engine_options(url, label))
+        track_engine(label, engine)
+        maker = _replica_makers.setdefault(url, sessionmaker(autocommit=False, autoflush=False, bind=engine))
+    return maker
+
+def _async_replica_maker(url: str) -> async_sessionmaker:
+    maker = _async_replica_makers.get(url)
+    if maker is None:
+        label = f"{_replica_label(url)}-async"
+        aurl = async_db_url(url)
+        engine = create_async_engine(aurl, **_engine_options(aurl, label, is_async=True))
+        track_engine(label, engine.sync_engine)
+        maker = _async_replica_makers.setdefault(
+            url, async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        )
+    return maker
+
+def get_read_db(request: Request, primary=Depends(get_db)):
+    # the primary Session is cheap when unused: it only connects on first query
+    url = _replica_url(request)
+    if url is None:
+        yield primary
+        return
+    db = _replica_maker(url)()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_read_db(request: Request, primary=Depends(get_async_db)):
+    url = _replica_url(request)
+    if url is None:
+        yield primary
+        return
+    async with _async_replica_maker(url)() as db:
+        yield db
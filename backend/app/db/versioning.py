@@ -0,0 +1,59 @@
+# app/db/versioning.py
+"""
+Bumps response-cache table versions when a session commits writes to the
+tables the crop endpoints read from, and reports any committed write to
+the read-your-writes scope (app/db/routing.py).
+"""
+from itertools import chain
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.cache import response_cache
+from app.db.routing import note_write
+
+TRACKED_TABLES = frozenset({"crops", "media", "users"})
+_KEY = "dirty_tables"
+
+
+def _mark(session: Session, table: str) -> None:
+    if table:
+        session.info.setdefault(_KEY, set()).add(table)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        _mark(session, getattr(obj, "__tablename__", ""))
+
+
+def mark_written(session: Session, *tables: str) -> None:
+    """For writes the session can't see (raw COPY, driver-level SQL)."""
+    for table in tables:
+        _mark(session, table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk(orm_execute_state):
+    # query(...).update()/delete() and bulk insert() skip the flush
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            _mark(orm_execute_state.session, mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    tables = session.info.pop(_KEY, None)
+    if not tables:
+        return
+    note_write()
+    tracked = tables & TRACKED_TABLES
+    if tracked:
+        response_cache.bump(*sorted(tracked))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_KEY, None)
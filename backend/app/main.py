@@ -18,6 +18,7 @@ from app.core.errors import add_error_handlers
 from app.core.ratelimit import add_rate_limiting
 from app.observability import RequestLogMiddleware
 from app.middleware.max_body import MaxBodySizeMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
 
 
 from app.core.config import settings
@@ -41,7 +42,11 @@ from app.routes.sales import router as sales_routes
 from app.routes.security import router as security_routes
 from app.routes.cms import router as cms_routes
 
-from app.api.deps import get_current_user
+from app.api.deps import get_current_user, require_metrics_token
+from app.core.search_index import crop_search_index
+from app.core.threadpool import configure_threadpools
+from app.services import image_pipeline
+from app.db.session import get_session_factory
 
 configure_logging()
 log = logging.getLogger("mahaseel")
@@ -49,9 +54,9 @@ log = logging.getLogger("mahaseel")
 app = FastAPI(
     title=settings.app_name, version="0.1.0", docs_url="/docs", redoc_url="/redoc"
 )
-UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/uploads")
+UPLOAD_DIR = settings.upload_dir
 os.makedirs(UPLOAD_DIR, exist_ok=True)
-app.mount("/static", StaticFiles(directory=UPLOAD_DIR), name="static")
+app.mount(settings.static_url, StaticFiles(directory=UPLOAD_DIR), name="static")
 
 app.add_middleware(
     CORSMiddleware,
@@ -59,7 +64,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "ETag"],
     max_age=600,
 )
 
@@ -132,12 +137,44 @@ def healthz():
     return {"status": "ok", "env": settings.env}
 
 
+@app.on_event("startup")
+async def size_threadpools():
+    # must run on the event loop: the default thread limiter is per loop
+    configure_threadpools()
+
+
+@app.on_event("shutdown")
+def stop_image_pool():
+    image_pipeline.shutdown()
+
+
+@app.on_event("startup")
+def warm_search_index():
+    if not settings.search_index_enabled:
+        return
+    db = get_session_factory()()
+    try:
+        crop_search_index.rebuild(db)
+    except Exception:
+        # cold index just means `q` falls back to SQL until the first rebuild
+        log.exception("crop search index warm-up failed")
+    finally:
+        db.close()
+
+
 # hardening
 add_rate_limiting(app)
 add_error_handlers(app)
 
 # middleware
 app.add_middleware(MaxBodySizeMiddleware, max_body_size=10 * 1024 * 1024)
+app.add_middleware(ReadYourWritesMiddleware)
+
+# Prometheus: HTTP metrics plus the DB pool gauges from app/db/pool_metrics.py
+if settings.metrics_enabled:
+    Instrumentator().instrument(app).expose(
+        app, include_in_schema=False, dependencies=[Depends(require_metrics_token)],
+    )
 
 
 # routes
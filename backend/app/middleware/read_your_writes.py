@@ -0,0 +1,19 @@
+# app/middleware/read_your_writes.py
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+
+from app.db.routing import client_identity, close_write_scope, open_write_scope, pin_to_primary
+
+
+class ReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """Pins a client to the primary after any request of theirs that committed a write."""
+
+    async def dispatch(self, request: Request, call_next):
+        token = open_write_scope()
+        try:
+            response = await call_next(request)
+        finally:
+            wrote = close_write_scope(token)
+        if wrote:
+            pin_to_primary(client_identity(request))
+        return response
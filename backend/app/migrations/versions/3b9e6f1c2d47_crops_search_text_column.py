@@ -0,0 +1,76 @@
+"""crops: write-time normalized search_text + full-text index
+
+Revision ID: 3b9e6f1c2d47
+Revises: f12c3d4e5b67
+Create Date: 2025-09-10 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.text import crop_search_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9e6f1c2d47'
+down_revision: Union[str, None] = 'f12c3d4e5b67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgres() -> bool:
+    bind = op.get_bind()
+    return bind.dialect.name.lower() in ("postgresql", "postgres")
+
+
+def _legacy_norm_expr(col: str) -> str:
+    # the on-the-fly expression the c4c4224b3141 indexes were built on
+    expr = col
+    for a, b in (("أ", "ا"), ("إ", "ا"), ("آ", "ا"), ("ى", "ي"), ("ؤ", "و"), ("ئ", "ي")):
+        expr = f"replace({expr},'{a}','{b}')"
+    return f"lower({expr})"
+
+
+def upgrade() -> None:
+    op.add_column('crops', sa.Column('search_text', sa.Text(), nullable=True))
+
+    # backfill with the same Python normalizer the app uses on write
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name, type, state FROM crops")).fetchall()
+    for r in rows:
+        bind.execute(
+            sa.text("UPDATE crops SET search_text = :t WHERE id = :id"),
+            {"t": crop_search_text(r.name, r.type, r.state), "id": r.id},
+        )
+
+    if not _is_postgres():
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_crops_search_text_trgm "
+        "ON crops USING gin (search_text gin_trgm_ops);"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_crops_search_tsv "
+        "ON crops USING gin (to_tsvector('simple', coalesce(search_text, '')));"
+    )
+
+    # queries no longer use the replace() chains
+    op.execute("DROP INDEX IF EXISTS idx_crops_state_trgm;")
+    op.execute("DROP INDEX IF EXISTS idx_crops_type_trgm;")
+    op.execute("DROP INDEX IF EXISTS idx_crops_name_trgm;")
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        op.execute("DROP INDEX IF EXISTS idx_crops_search_tsv;")
+        op.execute("DROP INDEX IF EXISTS idx_crops_search_text_trgm;")
+        for col in ("name", "type", "state"):
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_crops_{col}_trgm "
+                f"ON crops USING gin ({_legacy_norm_expr(col)} gin_trgm_ops);"
+            )
+    op.drop_column('crops', 'search_text')
@@ -0,0 +1,30 @@
+"""crops: updated_at row version
+
+Revision ID: 5c7a9e3d8f12
+Revises: 8d2f4a6b1e90
+Create Date: 2025-09-14 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7a9e3d8f12'
+down_revision: Union[str, None] = '8d2f4a6b1e90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'crops',
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    op.execute(sa.text('UPDATE crops SET updated_at = created_at'))
+
+
+def downgrade() -> None:
+    op.drop_column('crops', 'updated_at')
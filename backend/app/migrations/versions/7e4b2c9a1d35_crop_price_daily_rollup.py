@@ -0,0 +1,70 @@
+"""crop_price_daily rollup for /crops/stats
+
+Revision ID: 7e4b2c9a1d35
+Revises: 5c7a9e3d8f12
+Create Date: 2025-09-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e4b2c9a1d35'
+down_revision: Union[str, None] = '5c7a9e3d8f12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgres() -> bool:
+    bind = op.get_bind()
+    return bind.dialect.name.lower() in ("postgresql", "postgres")
+
+
+def upgrade() -> None:
+    op.create_table(
+        'crop_price_daily',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('type', sa.String(length=80), nullable=False),
+        sa.Column('state', sa.String(length=80), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('n', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'type', 'state', 'price'),
+    )
+    op.create_index('ix_crop_price_daily_type_state_day', 'crop_price_daily', ['type', 'state', 'day'])
+    op.create_table(
+        'rollup_watermarks',
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('full_refreshed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # incremental refresh looks up crops changed since the watermark
+    op.create_index('ix_crops_updated_at', 'crops', ['updated_at'])
+
+    # seed it here so GET /crops/stats never has to run the first full
+    # refresh inside a request; later refreshes start from this watermark.
+    # Days are UTC, like app/repositories/stats.py _created_day
+    if _is_postgres():
+        day = "date(timezone('UTC', created_at))"
+    else:
+        day = "date(created_at)"
+    op.execute(
+        "INSERT INTO crop_price_daily (day, type, state, price, n) "
+        f"SELECT {day}, coalesce(type, ''), coalesce(state, ''), price, count(*) "
+        "FROM crops WHERE price IS NOT NULL "
+        f"GROUP BY {day}, coalesce(type, ''), coalesce(state, ''), price"
+    )
+    op.execute(
+        "INSERT INTO rollup_watermarks (name, refreshed_at, full_refreshed_at) "
+        "VALUES ('crop_price_daily', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_crops_updated_at', table_name='crops')
+    op.drop_table('rollup_watermarks')
+    op.drop_index('ix_crop_price_daily_type_state_day', table_name='crop_price_daily')
+    op.drop_table('crop_price_daily')
@@ -0,0 +1,45 @@
+"""crops: geo indexes for near/bbox search
+
+Revision ID: 8d2f4a6b1e90
+Revises: 3b9e6f1c2d47
+Create Date: 2025-09-12 09:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2f4a6b1e90'
+down_revision: Union[str, None] = '3b9e6f1c2d47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_postgres() -> bool:
+    bind = op.get_bind()
+    return bind.dialect.name.lower() in ("postgresql", "postgres")
+
+
+def upgrade() -> None:
+    op.execute(sa.text('CREATE INDEX IF NOT EXISTS ix_crops_lat_lng ON crops (lat, lng)'))
+
+    if not _is_postgres():
+        return
+
+    # earthdistance needs cube; ll_to_earth() is immutable so it can be indexed
+    op.execute("CREATE EXTENSION IF NOT EXISTS cube;")
+    op.execute("CREATE EXTENSION IF NOT EXISTS earthdistance;")
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_crops_earth ON crops "
+        "USING gist (ll_to_earth(lat, lng)) "
+        "WHERE lat IS NOT NULL AND lng IS NOT NULL;"
+    )
+
+
+def downgrade() -> None:
+    if _is_postgres():
+        op.execute("DROP INDEX IF EXISTS idx_crops_earth;")
+    op.execute(sa.text('DROP INDEX IF EXISTS ix_crops_lat_lng'))
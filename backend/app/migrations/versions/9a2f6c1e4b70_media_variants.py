@@ -0,0 +1,26 @@
+"""media.variants: resized WebP/JPEG derivatives
+
+Revision ID: 9a2f6c1e4b70
+Revises: 7e4b2c9a1d35
+Create Date: 2025-09-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a2f6c1e4b70'
+down_revision: Union[str, None] = '7e4b2c9a1d35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('media', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('media', 'variants')
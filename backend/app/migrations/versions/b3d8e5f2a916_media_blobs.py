@@ -0,0 +1,42 @@
+"""media_blobs: content-addressed image storage with refcounts
+
+Revision ID: b3d8e5f2a916
+Revises: 9a2f6c1e4b70
+Create Date: 2025-09-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d8e5f2a916'
+down_revision: Union[str, None] = '9a2f6c1e4b70'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_blobs',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('path', sa.String(length=512), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=True),
+        sa.Column('height', sa.Integer(), nullable=True),
+        sa.Column('variants', sa.JSON(), nullable=True),
+        sa.Column('refcount', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint('hash'),
+    )
+    op.add_column('media', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_media_content_hash', 'media', ['content_hash'])
+    op.create_foreign_key('fk_media_content_hash', 'media', 'media_blobs', ['content_hash'], ['hash'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('fk_media_content_hash', 'media', type_='foreignkey')
+    op.drop_index('ix_media_content_hash', table_name='media')
+    op.drop_column('media', 'content_hash')
+    op.drop_table('media_blobs')
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from .user import User, Role
 from .crop import Crop
-from .media import Media
+from .media import Media, MediaBlob
 from .order import Order, OrderStatus
 from .rating import Rating
 from .otps import OTP
@@ -11,12 +11,14 @@ from .saved_search import SavedSearch
 from .social_account import SocialAccount
 from .wallet import WalletTransaction, PayoutMethod
 from .chat import Conversation, ConversationParticipant, Message
+from .price_stats import CropPriceDaily, RollupWatermark
 
 __all__ = [
     "User",
     "Role",
     "Crop",
     "Media",
+    "MediaBlob",
     "Order",
     "OrderStatus",
     "Rating",
@@ -30,4 +32,6 @@ __all__ = [
     "Conversation",
     "ConversationParticipant",
     "Message",
+    "CropPriceDaily",
+    "RollupWatermark",
 ]
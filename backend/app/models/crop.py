@@ -1,12 +1,13 @@
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Integer, Float, Text, ForeignKey, DateTime, func
+from sqlalchemy import String, Integer, Float, Text, ForeignKey, DateTime, func, event, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
+from app.utils.text import crop_search_text
 
 if TYPE_CHECKING:
     from .user import User
@@ -14,6 +15,10 @@ if TYPE_CHECKING:
     from .order import Order
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
 class Crop(Base):
     __tablename__ = "crops"
 
@@ -32,8 +37,19 @@ class Crop(Base):
     address: Mapped[str | None] = mapped_column(String(160), nullable=True)
 
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # normalized name/type/state, maintained on write (see _fill_search_text)
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # set client-side for microsecond resolution (SQLite's CURRENT_TIMESTAMP has
+    # whole seconds, Postgres' now() is per transaction), so rows inserted
+    # together don't tie on the (created_at, id) keyset; the server default
+    # still covers raw SQL inserts
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now(),index=True
+        DateTime(timezone=True), default=_utcnow, server_default=func.now(),index=True
+    )
+    # row version for ETags; media changes are tracked via the media rows themselves
+    updated_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=True, index=True
     )
 
     seller_id: Mapped[int] = mapped_column(
@@ -41,8 +57,17 @@ class Crop(Base):
     )
 
     # Relationships
-    seller = relationship("User", back_populates="crops", lazy="joined")
+    seller = relationship("User", back_populates="crops", lazy="select")
     media: Mapped[list["Media"]] = relationship(
         back_populates="crop", cascade="all, delete-orphan"
     )
     orders: Mapped[list["Order"]] = relationship(back_populates="crop")
+
+    # bounding-box prefilter for near/bbox search (Postgres also has a GiST earthdistance index)
+    __table_args__ = (Index("ix_crops_lat_lng", "lat", "lng"),)
+
+
+@event.listens_for(Crop, "before_insert")
+@event.listens_for(Crop, "before_update")
+def _fill_search_text(mapper, connection, target: Crop) -> None:
+    target.search_text = crop_search_text(target.name, target.type, target.state)
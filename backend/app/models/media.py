@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Integer, Boolean, ForeignKey, DateTime, func, Index
+from sqlalchemy import JSON, String, Integer, Boolean, ForeignKey, DateTime, func, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -12,6 +12,25 @@ if TYPE_CHECKING:
     from .crop import Crop
 
 
+class MediaBlob(Base):
+    """
+    One stored image per distinct upload (sha256 of the original bytes).
+    Media rows referencing the same bytes share its objects; `refcount`
+    counts them, and the objects are deleted when it drops to zero.
+    """
+    __tablename__ = "media_blobs"
+
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    path: Mapped[str] = mapped_column(String(512))
+    width: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    variants: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    refcount: Mapped[int] = mapped_column(Integer, default=1, server_default="1")
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+
+
 class Media(Base):
     __tablename__ = "media"
 
@@ -20,6 +39,13 @@ class Media(Base):
     is_main: Mapped[bool] = mapped_column(Boolean, default=False, index=True)
     width: Mapped[int | None] = mapped_column(Integer, nullable=True)
     height: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # resized copies, smallest first: [{"w", "h", "webp": path, "jpeg": path}]
+    # (the largest JPEG is `path` itself); None for images stored before them
+    variants: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    # set for uploads stored content-addressed; path/variants are copied from the blob
+    content_hash: Mapped[str | None] = mapped_column(
+        ForeignKey("media_blobs.hash"), index=True, nullable=True
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import String, Integer, Float, Date, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CropPriceDaily(Base):
+    """
+    Rollup behind GET /crops/stats: listings per (created day, type, state,
+    price). Prices cluster on round numbers, so this stays far smaller than
+    crops while still giving exact percentiles. Maintained by
+    app/repositories/stats.py, never written by request handlers.
+    """
+    __tablename__ = "crop_price_daily"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    type: Mapped[str] = mapped_column(String(80), primary_key=True)
+    # "" = no state, so the column can be part of the primary key
+    state: Mapped[str] = mapped_column(String(80), primary_key=True)
+    price: Mapped[float] = mapped_column(Float, primary_key=True)
+    n: Mapped[int] = mapped_column(Integer)
+
+    __table_args__ = (Index("ix_crop_price_daily_type_state_day", "type", "state", "day"),)
+
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # crops changed (updated_at) after refreshed_at are not in the rollup yet
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    # last full rebuild; it is what drops deleted crops
+    full_refreshed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
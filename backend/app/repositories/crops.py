@@ -1,24 +1,326 @@
 # app/repositories/crops.py
-from sqlalchemy.orm import Session, aliased
+import json
+from dataclasses import dataclass
+from typing import Iterable, Optional, Union
+
+from sqlalchemy import Integer, cast, func, select, or_, and_, case, false, literal_column
+from sqlalchemy.orm import Session, Query, aliased, joinedload, load_only, selectinload
 from app.models.crop import Crop
 from app.models.media import Media
+from app.models.user import User
+from app.core.config import settings
+from app.core.search_index import crop_search_index
+from app.utils.geo import KM_PER_DEG_LAT, bbox_around, lng_scale
+from app.utils.serializers import CROP_FIELD_COLUMNS, SELLER_FIELDS
 
-def get_crop_with_main(db: Session, crop_id: int):
+def with_main(q: Query) -> Query:
+    """
+    Adds the main image as a second entity via an outer join; the partial
+    unique index uq_media_one_per_crop guarantees 0..1 rows per crop. Apply
+    it after counting - the count doesn't need the join.
+    """
     M = aliased(Media)
-    # left join to main image (partial unique index guarantees 0..1)
-    q = (
-        db.query(Crop, M)
-        .outerjoin(M, (M.crop_id == Crop.id) & (M.is_main == True))
-        .filter(Crop.id == crop_id)
-    )
-    row = q.first()
+    return q.add_entity(M).outerjoin(M, (M.crop_id == Crop.id) & (M.is_main == True))
+
+
+def crops_with_main(db: Session, options: Iterable = ()) -> Query:
+    """Query yielding (Crop, Media|None) rows; filters/ordering are up to the caller."""
+    return with_main(db.query(Crop).options(*options))
+
+
+def get_crop_with_main(db: Session, crop_id: int, options: Iterable = ()):
+    row = crops_with_main(db, options).filter(Crop.id == crop_id).first()
     return row  # (Crop, Media|None)
 
-def list_crops_with_main(db: Session, skip=0, limit=20):
-    M = aliased(Media)
-    q = (
-        db.query(Crop, M)
-        .outerjoin(M, (M.crop_id == Crop.id) & (M.is_main == True))
-        .offset(skip).limit(limit)
+def list_crops_with_main(db: Session, skip=0, limit=20, options: Iterable = ()):
+    return crops_with_main(db, options).offset(skip).limit(limit).all()  # list[(Crop, Media|None)]
+
+
+# --- free-text search over crops.search_text (normalized at write time) ---
+
+_TS_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _tsvector():
+    # must match the expression behind idx_crops_search_tsv (literals, not binds)
+    return func.to_tsvector(_TS_CONFIG, func.coalesce(Crop.search_text, literal_column("''")))
+
+
+def _substring_match(q_norm: str):
+    return Crop.search_text.contains(q_norm, autoescape=True)
+
+
+def _fulltext_match(q_norm: str):
+    return _tsvector().op("@@")(func.plainto_tsquery(_TS_CONFIG, q_norm))
+
+
+def search_filter(q_norm: str, dialect: str):
+    """`q_norm` must already be normalize_ar()'d, like the stored column."""
+    if dialect == "postgresql":
+        return or_(_substring_match(q_norm), _fulltext_match(q_norm))
+    return _substring_match(q_norm)
+
+
+def search_rank(q_norm: str, dialect: str):
+    if dialect == "postgresql":
+        return func.ts_rank(_tsvector(), func.plainto_tsquery(_TS_CONFIG, q_norm))
+    # no full-text on SQLite: prefer rows whose name starts with the query
+    return case((Crop.search_text.startswith(q_norm, autoescape=True), 1.0), else_=0.0)
+
+
+# --- geo ---
+
+def _ll_to_earth(lat, lng):
+    return func.ll_to_earth(lat, lng)
+
+
+def distance_km(lat: float, lng: float, dialect: str):
+    """
+    Distance expression for ORDER BY. Postgres uses earthdistance (GiST
+    indexed); elsewhere an equirectangular approximation, returned squared
+    since SQLite has no sqrt() - it is only used for ordering there.
+    """
+    if dialect == "postgresql":
+        return func.earth_distance(_ll_to_earth(lat, lng), _ll_to_earth(Crop.lat, Crop.lng)) / 1000.0
+    dx = (Crop.lng - lng) * (KM_PER_DEG_LAT * lng_scale(lat))
+    dy = (Crop.lat - lat) * KM_PER_DEG_LAT
+    return dx * dx + dy * dy
+
+
+def radius_filter(lat: float, lng: float, radius_km: float, dialect: str):
+    has_point = and_(Crop.lat.isnot(None), Crop.lng.isnot(None))
+    if dialect == "postgresql":
+        center = _ll_to_earth(lat, lng)
+        meters = radius_km * 1000.0
+        return and_(
+            has_point,
+            func.earth_box(center, meters).op("@>")(_ll_to_earth(Crop.lat, Crop.lng)),
+            func.earth_distance(center, _ll_to_earth(Crop.lat, Crop.lng)) <= meters,
+        )
+    # bounding-box prefilter (ix_crops_lat_lng), then the exact-enough circle
+    return and_(has_point, bbox_filter(bbox_around(lat, lng, radius_km)),
+                distance_km(lat, lng, dialect) <= radius_km * radius_km)
+
+
+def bbox_filter(bbox: tuple[float, float, float, float]):
+    min_lng, min_lat, max_lng, max_lat = bbox
+    return and_(Crop.lat.between(min_lat, max_lat), Crop.lng.between(min_lng, max_lng))
+
+
+# --- shared listing filters ---
+
+@dataclass(frozen=True)
+class CropFilters:
+    """Structured + text + geo filters shared by the crop browse endpoints (hashable, usable as a cache key)."""
+    state: Optional[str] = None          # already title-cased like at write time
+    type: Optional[str] = None
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    q: Optional[str] = None              # already normalize_ar()'d
+    near: Optional[tuple[float, float]] = None  # (lat, lng)
+    radius_km: Optional[float] = None
+    bbox: Optional[tuple[float, float, float, float]] = None  # (min_lng, min_lat, max_lng, max_lat)
+
+
+def apply_filters(db: Session, query: Query, f: CropFilters) -> Query:
+    if f.type:
+        query = query.filter(Crop.type == f.type)
+    if f.state:
+        query = query.filter(Crop.state == f.state)
+    if f.min_price is not None:
+        query = query.filter(Crop.price >= f.min_price)
+    if f.max_price is not None:
+        query = query.filter(Crop.price <= f.max_price)
+
+    dialect = db.get_bind().dialect.name
+
+    # search filter on the write-time normalized column (trigram + full-text indexed)
+    if f.q:
+        ids = None
+        if settings.search_index_enabled:
+            crop_search_index.refresh()
+            ids = crop_search_index.candidates(f.q)
+        if ids is not None:
+            # the index stands in for the substring half of search_filter:
+            # it narrows the rows, and re-checking the text on that small set
+            # drops crops edited since the snapshot was taken. Full-text
+            # matches (words reordered or apart) aren't substrings, so on
+            # Postgres they are ORed back in to keep the SQL path's results.
+            match = and_(Crop.id.in_(ids), _substring_match(f.q)) if ids else false()
+            if dialect == "postgresql":
+                match = or_(match, _fulltext_match(f.q))
+            query = query.filter(match)
+        else:
+            query = query.filter(search_filter(f.q, dialect))
+
+    if f.bbox:
+        query = query.filter(bbox_filter(f.bbox))
+    if f.near and f.radius_km:
+        query = query.filter(radius_filter(f.near[0], f.near[1], f.radius_km, dialect))
+    return query
+
+
+# --- map clusters ---
+
+CELLS_PER_TILE = 8  # ~32px cells on a 256px map tile
+
+
+def cluster_cell_deg(zoom: int) -> float:
+    return 360.0 / (2 ** zoom * CELLS_PER_TILE)
+
+
+def _grid(expr, dialect: str):
+    # callers shift coordinates to be non-negative; CAST truncates on SQLite
+    # but rounds on Postgres, so use floor() there
+    if dialect == "postgresql":
+        return func.floor(expr)
+    return cast(expr, Integer)
+
+
+def crop_clusters(db: Session, f: CropFilters, zoom: int) -> list[dict]:
+    """Grid-bucketed pins for the map: one row per non-empty cell."""
+    dialect = db.get_bind().dialect.name
+    cell = cluster_cell_deg(zoom)
+    gx = _grid((Crop.lng + 180.0) / cell, dialect).label("gx")
+    gy = _grid((Crop.lat + 90.0) / cell, dialect).label("gy")
+
+    q = db.query(
+        gx,
+        gy,
+        func.count(Crop.id).label("n"),
+        func.avg(Crop.lat).label("lat"),
+        func.avg(Crop.lng).label("lng"),
+        func.min(Crop.price).label("min_price"),
+        func.min(Crop.id).label("any_id"),
+    ).filter(Crop.lat.isnot(None), Crop.lng.isnot(None))
+    q = apply_filters(db, q, f).group_by(gx, gy)
+
+    return [
+        {
+            "count": r.n,
+            "lat": float(r.lat),
+            "lng": float(r.lng),
+            "min_price": float(r.min_price) if r.min_price is not None else None,
+            # single-listing cells can be drawn as a normal pin
+            "crop_id": r.any_id if r.n == 1 else None,
+        }
+        for r in q.all()
+    ]
+
+
+# --- facets ---
+
+DEFAULT_PRICE_EDGES: tuple[float, ...] = (100.0, 500.0, 1000.0, 5000.0)
+
+
+def _price_bucket(edges: tuple[float, ...]):
+    # bucket i holds edges[i-1] <= price < edges[i]; the last one is open-ended
+    return case(
+        *[(Crop.price < e, i) for i, e in enumerate(edges)],
+        else_=len(edges),
+    )
+
+
+def crop_facets(db: Session, f: CropFilters, edges: tuple[float, ...] = DEFAULT_PRICE_EDGES) -> dict:
+    """Counts per state, type and price bucket from a single GROUP BY."""
+    bucket = _price_bucket(edges).label("bucket")
+    q = db.query(Crop.state, Crop.type, bucket, func.count(Crop.id).label("n"))
+    rows = apply_filters(db, q, f).group_by(Crop.state, Crop.type, bucket).all()
+
+    states: dict[Optional[str], int] = {}
+    types: dict[Optional[str], int] = {}
+    buckets = [0] * (len(edges) + 1)
+    total = 0
+    for state, type_, b, n in rows:
+        states[state] = states.get(state, 0) + n
+        types[type_] = types.get(type_, 0) + n
+        buckets[b] += n
+        total += n
+
+    bounds = (None, *edges, None)
+    return {
+        "total": total,
+        "state": [{"value": k, "count": v} for k, v in sorted(states.items(), key=lambda kv: -kv[1])],
+        "type": [{"value": k, "count": v} for k, v in sorted(types.items(), key=lambda kv: -kv[1])],
+        "price": [
+            {"min": bounds[i], "max": bounds[i + 1], "count": n}
+            for i, n in enumerate(buckets)
+        ],
+    }
+
+
+# --- loader options ---
+
+def crop_load_options(fields: Optional[tuple[str, ...]] = None, extra_columns: tuple[str, ...] = ()) -> list:
+    """
+    Loader options for serializing crops. With a field subset only the
+    needed columns are selected, the seller is joined only for seller_*
+    fields and the media collection is loaded only for images; image_url,
+    thumb_url and srcset come from the crops_with_main() join instead.
+    """
+    if fields is None:
+        return [
+            joinedload(Crop.seller).load_only(User.id, User.name, User.phone),
+            selectinload(Crop.media),
+        ]
+
+    cols = {"id", *extra_columns}
+    for f in fields:
+        cols.update(CROP_FIELD_COLUMNS.get(f, ()))
+    opts = [load_only(*(getattr(Crop, c) for c in sorted(cols)))]
+
+    # relationships left out stay unloaded (lazy="select"); the serializer
+    # never touches them for fields outside the subset
+    if SELLER_FIELDS.intersection(fields):
+        opts.append(joinedload(Crop.seller).load_only(User.id, User.name, User.phone))
+    if "images" in fields:
+        opts.append(selectinload(Crop.media))
+    return opts
+
+
+ESTIMATE_CAP = 1000
+
+
+def count_exact(query: Query) -> int:
+    return query.order_by(None).count()
+
+
+def _explain_sql(query: Query, dialect) -> tuple[str, dict]:
+    stmt = query.enable_eagerloads(False).with_entities(Crop.id).order_by(None).statement
+    # expand IN (...) lists (the search-index candidates) into plain binds:
+    # the driver-level EXPLAIN never goes through SQLAlchemy's post-compile step
+    compiled = stmt.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+    return "EXPLAIN (FORMAT JSON) " + str(compiled), compiled.params
+
+
+def _planner_rows(db: Session, query: Query) -> Optional[int]:
+    """Postgres planner row estimate for the filtered query (no execution)."""
+    bind = db.get_bind()
+    if bind.dialect.name != "postgresql":
+        return None
+    sql, params = _explain_sql(query, bind.dialect)
+    raw = db.connection().exec_driver_sql(sql, params).scalar()
+    plan = raw if isinstance(raw, list) else json.loads(raw)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_estimate(db: Session, query: Query, cap: Optional[int] = None) -> Union[int, str]:
+    """
+    Exact up to `cap` rows (the scan stops at cap+1), otherwise the planner
+    estimate on Postgres or a "<cap>+" marker elsewhere.
+    """
+    cap = ESTIMATE_CAP if cap is None else cap
+    sub = (
+        query.enable_eagerloads(False)
+        .with_entities(Crop.id)
+        .order_by(None)
+        .limit(cap + 1)
+        .subquery()
     )
-    return q.all()  # list[(Crop, Media|None)]
+    n = db.execute(select(func.count()).select_from(sub)).scalar_one()
+    if n <= cap:
+        return n
+    est = _planner_rows(db, query)
+    if est is not None and est > cap:
+        return est
+    return f"{cap}+"
@@ -0,0 +1,208 @@
+# app/repositories/stats.py
+import logging
+import math
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import Date, and_, delete, func, insert, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.crop import Crop
+from app.models.price_stats import CropPriceDaily, RollupWatermark
+
+log = logging.getLogger("mahaseel")
+
+PRICE_ROLLUP = "crop_price_daily"
+# updated_at precision (whole seconds on SQLite) and in-flight commits
+_SLACK = timedelta(seconds=5)
+_refresh_lock = threading.Lock()
+
+
+def _aware(dt: datetime) -> datetime:
+    # SQLite hands timestamptz back naive; values are stored as UTC
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def _created_day(dialect: str):
+    """
+    UTC calendar day of created_at - the same days _created_in() selects.
+    Postgres' date() of a timestamptz uses the session TimeZone instead.
+    """
+    created = Crop.created_at
+    if dialect == "postgresql":
+        # a literal, not a bind: the same expression is selected and grouped by
+        created = func.timezone(literal_column("'UTC'"), created)
+    return func.date(created, type_=Date)
+
+
+def _created_in(days: list[date]):
+    """
+    created_at within any of `days` (UTC), as half-open ranges the created_at
+    index can serve - unlike date(created_at) IN (...). Consecutive days
+    share one range.
+    """
+    ranges: list[list[date]] = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+
+    def at(d: date) -> datetime:
+        return datetime(d.year, d.month, d.day, tzinfo=timezone.utc)
+
+    return or_(*(and_(Crop.created_at >= at(start), Crop.created_at < at(end)) for start, end in ranges))
+
+
+def _rollup_select(dialect: str):
+    day = _created_day(dialect)
+    type_ = func.coalesce(Crop.type, "")
+    state = func.coalesce(Crop.state, "")
+    return (
+        select(day, type_, state, Crop.price, func.count())
+        .where(Crop.price.isnot(None))
+        .group_by(day, type_, state, Crop.price)
+    )
+
+
+def _insert_rollup(query):
+    return insert(CropPriceDaily).from_select(["day", "type", "state", "price", "n"], query)
+
+
+def _try_lock(db: Session) -> bool:
+    """One refresher at a time across workers (Postgres) - the rest skip."""
+    if db.get_bind().dialect.name != "postgresql":
+        return True
+    return bool(db.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:n))"), {"n": PRICE_ROLLUP}).scalar())
+
+
+def price_rollup_watermark(db: Session) -> Optional[RollupWatermark]:
+    return db.get(RollupWatermark, PRICE_ROLLUP)
+
+
+def price_rollup_stale(wm: Optional[RollupWatermark]) -> bool:
+    if wm is None:
+        return True
+    age = datetime.now(timezone.utc) - _aware(wm.refreshed_at)
+    return age.total_seconds() > settings.stats_rollup_max_age_seconds
+
+
+def refresh_price_rollup(db: Session, full: bool = False) -> Optional[dict]:
+    """
+    Bring crop_price_daily up to date. Incremental runs re-aggregate only the
+    created-days of crops whose updated_at moved past the watermark; deleted
+    crops leave no such trace, so a full rebuild runs every
+    STATS_ROLLUP_FULL_REFRESH_HOURS (or on demand). Returns None when another
+    refresh holds the lock.
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return None
+    try:
+        if not _try_lock(db):
+            db.rollback()
+            return None
+        now = datetime.now(timezone.utc)
+        dialect = db.get_bind().dialect.name
+        wm = price_rollup_watermark(db)
+        full = (
+            full
+            or wm is None
+            or now - _aware(wm.full_refreshed_at) > timedelta(hours=settings.stats_rollup_full_refresh_hours)
+        )
+
+        if full:
+            db.execute(delete(CropPriceDaily))
+            db.execute(_insert_rollup(_rollup_select(dialect)))
+            days = None
+        else:
+            since = _aware(wm.refreshed_at) - _SLACK
+            days = sorted(set(db.execute(
+                select(_created_day(dialect)).where(Crop.updated_at >= since).distinct()
+            ).scalars()))
+            if days:
+                db.execute(delete(CropPriceDaily).where(CropPriceDaily.day.in_(days)))
+                db.execute(_insert_rollup(_rollup_select(dialect).where(_created_in(days))))
+
+        db.merge(RollupWatermark(
+            name=PRICE_ROLLUP,
+            refreshed_at=now,
+            full_refreshed_at=now if full else wm.full_refreshed_at,
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        _refresh_lock.release()
+
+    log.info("price rollup refreshed", extra={"full": full, "days": None if days is None else len(days)})
+    return {"full": full, "days": None if days is None else len(days)}
+
+
+def refresh_price_rollup_detached() -> None:
+    """For BackgroundTasks: own session, errors logged (the old rollup keeps serving)."""
+    from app.db.session import get_session_factory  # lazy import to avoid cycles
+
+    db = get_session_factory()()
+    try:
+        refresh_price_rollup(db)
+    except Exception:
+        log.exception("price rollup refresh failed")
+    finally:
+        db.close()
+
+
+def _percentile(prices: list[tuple[float, int]], total: int, q: float) -> float:
+    """Nearest-rank percentile over (price, count) pairs sorted by price."""
+    rank = max(1, math.ceil(q * total))
+    seen = 0
+    for price, n in prices:
+        seen += n
+        if seen >= rank:
+            return price
+    return prices[-1][0]
+
+
+def _summary(counts: Counter) -> dict:
+    prices = sorted(counts.items())
+    total = sum(counts.values())
+    if not total:
+        return {"count": 0, "min": None, "max": None, "avg": None, "median": None, "p10": None, "p90": None}
+    return {
+        "count": total,
+        "min": prices[0][0],
+        "max": prices[-1][0],
+        "avg": round(sum(p * n for p, n in prices) / total, 2),
+        "median": _percentile(prices, total, 0.5),
+        "p10": _percentile(prices, total, 0.1),
+        "p90": _percentile(prices, total, 0.9),
+    }
+
+
+def price_stats(db: Session, type_: Optional[str] = None, state: Optional[str] = None, days: int = 30) -> dict:
+    """Price distribution of listings created in the last `days` days, plus a per-day trend - rollup only."""
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    q = (
+        select(CropPriceDaily.day, CropPriceDaily.price, func.sum(CropPriceDaily.n))
+        .where(CropPriceDaily.day >= since)
+        .group_by(CropPriceDaily.day, CropPriceDaily.price)
+    )
+    if type_:
+        q = q.where(CropPriceDaily.type == type_)
+    if state:
+        q = q.where(CropPriceDaily.state == state)
+
+    overall: Counter = Counter()
+    per_day: dict[date, Counter] = {}
+    for day, price, n in db.execute(q):
+        overall[price] += n
+        per_day.setdefault(day, Counter())[price] += n
+
+    trend = []
+    for day in sorted(per_day):
+        s = _summary(per_day[day])
+        trend.append({"day": day.isoformat(), "count": s["count"], "avg": s["avg"], "median": s["median"]})
+    return {**_summary(overall), "trend": trend}
@@ -1,7 +1,12 @@
 # backend/app/routes/admin.py
 import os
-from fastapi import APIRouter, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
 from app.scripts import seed as seed_script
+from app.db.session import get_db
+from app.api.deps import require_roles
+from app.core.search_index import crop_search_index
+from app.repositories.stats import refresh_price_rollup
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -12,3 +17,25 @@ def run_seed(x_seed_token: str | None = Header(default=None)):
         raise HTTPException(status_code=401, detail="unauthorized")
     seed_script.run()
     return {"status": "ok"}
+
+
+@router.post("/search-index/rebuild")
+def rebuild_search_index(
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("admin")),
+):
+    # rebuilds this worker's copy; other workers catch up within max_age
+    docs = crop_search_index.rebuild(db)
+    return {"status": "ok", "docs": docs}
+
+
+@router.post("/stats/refresh")
+def refresh_stats_rollup(
+    full: bool = False,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles("admin")),
+):
+    result = refresh_price_rollup(db, full=full)
+    if result is None:
+        raise HTTPException(status_code=409, detail="refresh already running")
+    return {"status": "ok", **result}
@@ -1,15 +1,16 @@
 # app/api/routes/chat.py
 from fastapi import APIRouter, Depends, HTTPException, Query, Path
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session,aliased
 from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from sqlalchemy import desc, and_
 
-from app.db.session import get_db
-from app.api.deps import get_current_user  # your auth
+from app.db.session import get_async_db, get_db
+from app.api.deps import get_current_user, get_current_user_async  # your auth
 from app.models.chat import Conversation, ConversationParticipant, Message
 from app.schemas.chat import ConversationOut, SendMessageIn, MessageOut, CreateConversationIn
-from sqlalchemy import desc, func, and_, or_
+from sqlalchemy import desc, func, and_, or_, select
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/chat", tags=["chat"])
@@ -18,38 +19,51 @@ class SendMessageIn(BaseModel):
     body: str
 
 @router.get("/conversations", response_model=List[ConversationOut])
-def list_conversations(
+async def list_conversations(
     scope: str = Query("all", pattern="^(all|buying|selling)$"),
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user = Depends(get_current_user_async),
 ):
     me_id = int(user.id)
 
     # Base query: conversations where I am a participant
     CP = aliased(ConversationParticipant)
     q = (
-        db.query(Conversation)
+        select(Conversation)
         .join(CP, CP.conversation_id == Conversation.id)
-        .filter(CP.user_id == me_id)
+        .where(CP.user_id == me_id)
         .order_by(desc(Conversation.updated_at))
     )
 
     # Optional “scope” filter using my role in that conversation
     if scope == "buying":
-        q = q.filter(CP.role == "buyer")
+        q = q.where(CP.role == "buyer")
     elif scope == "selling":
-        q = q.filter(CP.role == "seller")
+        q = q.where(CP.role == "seller")
+
+    convs = (await db.execute(q)).scalars().all()
+    if not convs:
+        return []
+
+    # last message per conversation in one round trip (was one query per conversation)
+    ranked = (
+        select(
+            Message,
+            func.row_number().over(
+                partition_by=Message.conversation_id,
+                order_by=(desc(Message.created_at), desc(Message.id)),
+            ).label("rn"),
+        )
+        .where(Message.conversation_id.in_([c.id for c in convs]))
+        .subquery()
+    )
+    M = aliased(Message, ranked)
+    last = {m.conversation_id: m for m in (await db.execute(select(M).where(ranked.c.rn == 1))).scalars()}
 
     # Build response with last message + (optional) unread count (0 for now)
-    convs = q.all()
     out: List[ConversationOut] = []
     for c in convs:
-        last_msg = (
-            db.query(Message)
-            .filter(Message.conversation_id == c.id)
-            .order_by(desc(Message.created_at))
-            .first()
-        )
+        last_msg = last.get(c.id)
         out.append(
             ConversationOut(
                 id=c.id,
@@ -61,7 +75,6 @@ def list_conversations(
     return out
 
 
-
 @router.post("/conversations", response_model=ConversationOut, status_code=201)
 def create_conversation(
     data: CreateConversationIn,
@@ -195,37 +208,33 @@ def send_message(
 
 
 @router.get("/conversations/{cid}/messages", response_model=List[MessageOut])
-def list_messages(
+async def list_messages(
     cid: int = Path(..., ge=1),
     limit: int = Query(30, ge=1, le=200),
     before_id: Optional[int] = Query(None, ge=1),
-    db: Session = Depends(get_db),
-    user = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user = Depends(get_current_user_async),
 ):
     me_id = int(user.id)
 
     # Ensure conversation exists & I am a participant
-    convo = db.query(Conversation).filter(Conversation.id == cid).first()
+    convo = await db.get(Conversation, cid)
     if not convo:
         raise HTTPException(status_code=404, detail="conversation not found")
 
-    is_participant = db.query(ConversationParticipant).filter_by(
-        conversation_id=cid, user_id=me_id
-    ).first()
+    is_participant = (await db.execute(
+        select(ConversationParticipant.user_id).filter_by(conversation_id=cid, user_id=me_id).limit(1)
+    )).first()
     if not is_participant:
         raise HTTPException(status_code=403, detail="not a participant")
 
-    q = db.query(Message).filter(Message.conversation_id == cid)
+    q = select(Message).where(Message.conversation_id == cid)
 
     if before_id:
         # paginate older messages
-        q = q.filter(Message.id < before_id)
+        q = q.where(Message.id < before_id)
 
     # Load newest-first, then reverse to chronological for UI
-    rows = (
-        q.order_by(desc(Message.id))
-         .limit(limit)
-         .all()
-    )
+    rows = (await db.execute(q.order_by(desc(Message.id)).limit(limit))).scalars().all()
     rows = list(reversed(rows))
     return [MessageOut.model_validate(m) for m in rows]
@@ -1,25 +1,92 @@
 # app/api/routes/crops.py
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, Form, File, UploadFile, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, Form, File, UploadFile, Body
+import hashlib
+import io
+import tempfile
 from enum import Enum
-from sqlalchemy import func, or_
-from sqlalchemy.orm import Session, selectinload, joinedload
+from datetime import datetime
+from sqlalchemy import or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 
-from app.schemas.crop import CropCreate, CropOut, LocationIn
-from app.db.session import get_db
-from app.models import Crop
+from app.schemas.crop import CropBatchIn, CropCreate, CropOut, LocationIn
+from app.db.session import get_async_read_db, get_db, get_read_db
+from app.models import Crop, Role, User
 from app.api.deps import require_roles
-from app.utils.serializers import serialize_crop
+from app.utils.serializers import CARD_FIELDS, serialize_crop, CropSerializer, parse_fields, render_json
+from app.utils.cursor import encode_cursor, decode_cursor, InvalidCursor
+from app.repositories.crops import (
+    CropFilters,
+    apply_filters,
+    count_exact,
+    count_estimate,
+    crop_clusters,
+    crop_load_options,
+    crop_facets,
+    DEFAULT_PRICE_EDGES,
+    cluster_cell_deg,
+    distance_km,
+    get_crop_with_main,
+    search_rank,
+    with_main,
+)
+from app.repositories.stats import (
+    price_rollup_stale,
+    price_rollup_watermark,
+    price_stats,
+    refresh_price_rollup_detached,
+)
+from app.services import image_pipeline
+from app.services.media_ingest import ingest_image
+from app.services.crop_import import FORMATS as IMPORT_FORMATS, format_for_content_type, import_crops
+from app.utils.geo import haversine_km
+from app.utils.etag import crop_fingerprint, make_etag, not_modified
+from app.utils.text import normalize_ar
+from app.utils.uploads import UploadTooLarge, discard, spool_upload
 from app.core.ratelimit import limiter
-from app.models.user import User
-import re
+from app.core.search_index import crop_search_index
+from app.core.suggest_index import crop_suggest_index
+from app.core.cache import response_cache, MISSING
+from app.core.config import settings
+from app.core.threadpool import run_io
 
 router = APIRouter(prefix="/crops", tags=["crops"])
 
+# tables whose writes invalidate cached browse responses (see app/db/versioning.py)
+CACHE_TABLES = ("crops", "media", "users")
+
+
+def _cache_get(request: Request, key: str):
+    # a client pinned to the primary after a write must not get a page that
+    # was cached from a lagging replica
+    if getattr(request.state, "pinned_to_primary", False):
+        return MISSING
+    return response_cache.get(key)
+
+
+def _conditional(request: Request, etag: str, body: Optional[bytes]) -> Response:
+    """
+    304 with no body when the client's copy is current, else the pre-rendered
+    JSON `body` tagged with the ETag (returned as-is, no response_model pass).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if body is None or not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 class CropSort(str, Enum):
     newest = "newest"
     price_asc = "price_asc"
     price_desc = "price_desc"
+    relevance = "relevance"  # full-text rank of `q`; offset pagination only
+    distance = "distance"    # nearest to `near` first; offset pagination only
+
+class TotalMode(str, Enum):
+    exact = "exact"        # COUNT(*) over the full filtered set
+    estimate = "estimate"  # capped count / planner estimate, may be "1000+"
+    none = "none"          # skip counting (infinite scroll)
 
 @router.post("", response_model=CropOut, status_code=201)
 def create_crop(
@@ -89,6 +156,7 @@ def create_crop(
     db.commit()
     db.refresh(crop)
     db.refresh(crop, attribute_names=["media"])
+    crop_search_index.add(crop.id, crop.search_text)
 
     # TODO: save `images` to Media if you want to handle uploads here
 
@@ -97,10 +165,26 @@ def create_crop(
 
 # app/api/routes/crops.py (add below the JSON create)
 from fastapi import UploadFile, File, Form
-from pathlib import Path
-from app.models.media import Media  # assumes you have this model
 
-UPLOAD_DIR = Path("static/uploads")
+
+def _save_crop(db: Session, crop: Crop) -> int:
+    db.add(crop)
+    db.flush()
+    crop_id = crop.id
+    db.commit()
+    return crop_id
+
+
+def _discard_crop(db: Session, crop_id: int) -> None:
+    db.rollback()
+    crop = db.get(Crop, crop_id)
+    if crop is not None:
+        db.delete(crop)
+        db.commit()
+
+
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # per image, like /media/upload
+MAX_IMPORT_BYTES = 10 * 1024 * 1024  # POST /crops/import body, like MaxBodySizeMiddleware
 
 @router.post("/upload", response_model=CropOut, status_code=201)
 async def create_crop_upload(
@@ -140,65 +224,172 @@ async def create_crop_upload(
         address=location_address,
         notes=notes,
     )
-    db.add(crop)
-    db.flush()  # get crop.id before saving media
-
-    # ensure upload dir exists
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
     # simple limits (defense-in-depth)
     if len(images) > 5:
         raise HTTPException(400, "You can upload up to 5 images")
 
-    saved_any = False
-    for idx, f in enumerate(images):
-        if not f.filename:
-            continue
-        # very light content-type guard
-        if not (f.content_type or "").startswith(("image/",)):
-            continue
-
-        # give it a deterministic unique path
-        suffix = Path(f.filename).suffix.lower() or ".jpg"
-        file_name = f"{crop.id}_{idx}{suffix}"
-        disk_path = UPLOAD_DIR / file_name
-
-        # stream to disk
-        with disk_path.open("wb") as out:
-            while chunk := await f.read(1024 * 1024):
-                out.write(chunk)
-
-        # persist Media row (store relative path; serializer builds URLs)
-        m = Media(
-            crop_id=crop.id,
-            path=f"uploads/{file_name}",
-            is_main=(idx == 0),
-        )
-        db.add(m)
-        saved_any = True
+    # committed up front: each image commits its own blob reference (see
+    # ingest_image), so no row lock outlives the awaits below
+    crop_id = await run_in_threadpool(_save_crop, db, crop)
+
+    try:
+        saved_any = False
+        for f in images:
+            if not f.filename:
+                continue
+            # very light content-type guard
+            if not (f.content_type or "").startswith(("image/",)):
+                continue
+
+            # spool on the upload threads, not the event loop or the handler
+            # pool, a chunk at a time with the size cap enforced and the content
+            # hashed while reading
+            digest = hashlib.sha256()
+            try:
+                tmp_path = await run_io(spool_upload, f.file, MAX_IMAGE_BYTES, None, digest)
+            except UploadTooLarge:
+                raise HTTPException(413, "Image too large (max 10MB)")
+            finally:
+                await f.close()
+
+            # same pipeline and content-addressed storage as /media/upload
+            try:
+                await ingest_image(db, tmp_path, digest.hexdigest(), crop_id=crop_id, is_main=not saved_any)
+            except image_pipeline.PipelineBusy:
+                raise HTTPException(429, "Image processing is busy, retry shortly", headers={"Retry-After": "5"})
+            except ValueError:
+                raise HTTPException(400, "Images must be valid image files")
+            finally:
+                discard(tmp_path)
+            saved_any = True
+    except Exception:
+        # all or nothing, as before: drop the listing and, through the
+        # cascade, the references its saved images took (app/db/media_refs.py)
+        await run_in_threadpool(_discard_crop, db, crop_id)
+        raise
 
-    db.commit()
     db.refresh(crop)
     db.refresh(crop, attribute_names=["media", "seller"])
+    crop_search_index.add(crop.id, crop.search_text)
 
     return serialize_crop(crop, request)
 
 
-@router.get("", response_model=dict)
-@limiter.limit("60/minute")
-def list_crops(
-    request: Request,
-    db: Session = Depends(get_db),
+def _fieldset(raw: Optional[str], extra: tuple[str, ...] = ()) -> Optional[tuple[str, ...]]:
+    try:
+        return parse_fields(raw, extra)
+    except ValueError as e:
+        raise HTTPException(400, f"unknown fields: {e}")
+
+
+def _parse_floats(raw: str, n: Optional[int], name: str) -> tuple[float, ...]:
+    try:
+        vals = tuple(float(p) for p in raw.split(","))
+    except ValueError:
+        raise HTTPException(400, f"invalid {name}")
+    if n is not None and len(vals) != n:
+        raise HTTPException(400, f"invalid {name}")
+    return vals
+
 
-    # filters
+async def crop_filters(
     state: Optional[str] = Query(default=None, description="State filter"),
     type_: Optional[str] = Query(default=None, alias="type", description="Crop type filter"),
     min_price: Optional[float] = Query(default=None, ge=0),
     max_price: Optional[float] = Query(default=None, ge=0),
 
-    # NEW: free-text search
+    # free-text search
     q: Optional[str] = Query(default=None, description="Free-text search on name/type/state"),
 
+    # geo
+    near: Optional[str] = Query(default=None, description="lat,lng of the buyer"),
+    radius_km: Optional[float] = Query(default=None, gt=0, le=1000),
+    bbox: Optional[str] = Query(default=None, description="min_lng,min_lat,max_lng,max_lat"),
+) -> CropFilters:
+    near_pt = None
+    if near:
+        lat, lng = _parse_floats(near, 2, "near")
+        if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+            raise HTTPException(400, "invalid near")
+        near_pt = (lat, lng)
+    if radius_km is not None and near_pt is None:
+        raise HTTPException(400, "radius_km requires near")
+
+    box = None
+    if bbox:
+        box = _parse_floats(bbox, 4, "bbox")
+        if box[0] > box[2] or box[1] > box[3]:
+            raise HTTPException(400, "invalid bbox")
+
+    return CropFilters(
+        # Normalize input the SAME way we normalized at write-time
+        state=state.strip().title() if state else None,
+        type=type_,
+        min_price=min_price,
+        max_price=max_price,
+        # q goes through the same normalizer that fills crops.search_text
+        q=normalize_ar(q) if q else None,
+        near=near_pt,
+        radius_km=radius_km,
+        bbox=box,
+    )
+
+
+@router.post("/import", response_model=dict)
+@limiter.limit("10/minute")
+async def import_crops_bulk(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", description="csv | ndjson (default: from Content-Type)"),
+    dry_run: bool = Query(False, description="Validate only, write nothing"),
+    seller_id: Optional[int] = Query(None, description="Admin only: import on behalf of this seller"),
+    db: Session = Depends(get_db),
+    user = Depends(require_roles("seller", "admin")),
+):
+    fmt = fmt or format_for_content_type(request.headers.get("content-type"))
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(415, "send text/csv or application/x-ndjson (or ?format=)")
+    if seller_id is not None:
+        if user.role.value != "admin":
+            raise HTTPException(403, "only admins can import for another seller")
+        seller = db.get(User, seller_id)
+        if seller is None:
+            raise HTTPException(404, "Seller not found")
+        if seller.role != Role.seller:
+            raise HTTPException(400, "seller_id must be a seller")
+
+    # spool the body as it arrives (memory first, disk past 1 MiB), then parse
+    # it row by row off the event loop. The cap is enforced while reading:
+    # MaxBodySizeMiddleware only sees Content-Length, not chunked bodies.
+    with tempfile.SpooledTemporaryFile(max_size=1 << 20) as spool:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > MAX_IMPORT_BYTES:
+                raise HTTPException(413, "Import too large (max 10MB)")
+            spool.write(chunk)
+        spool.seek(0)
+        stream = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+        try:
+            report = await run_in_threadpool(import_crops, db, stream, fmt, seller_id or user.id, dry_run)
+        except UnicodeDecodeError:
+            raise HTTPException(400, "body must be UTF-8")
+        finally:
+            stream.detach()
+    if report.imported:
+        # COPY/executemany bypass the per-crop add(); rebuild both on next use
+        crop_search_index.mark_stale()
+        crop_suggest_index.mark_stale()
+    return report.as_dict()
+
+
+@router.get("", response_model=dict)
+@limiter.limit("60/minute")
+async def list_crops(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
+    filters: CropFilters = Depends(crop_filters),
+
     # sorting
     sort: CropSort = Query(default=CropSort.newest),
 
@@ -206,108 +397,317 @@ def list_crops(
     limit: int = Query(50, ge=1, le=100),
     offset: Optional[int] = Query(None, ge=0),
     page: Optional[int] = Query(None, ge=1),
+    cursor: Optional[str] = Query(None, description="Opaque keyset cursor from a previous next_cursor"),
+    total_mode: TotalMode = Query(TotalMode.exact, alias="total"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of item fields, e.g. id,name,price,image_url"),
 ):
-    # ...existing validation and page/offset code...
-
-    # Normalize input the SAME way we normalized at write-time
-    state_norm = state.strip().title() if state else None  # you already do this
-    # --- NEW: normalize q (strip, lower, remove Arabic diacritics and unify letters)
-    def _normalize_ar(s: str) -> str:
-        # remove Arabic diacritics (tashkeel)
-        s = re.sub(r"[\u064B-\u0652]", "", s)
-        # unify Arabic forms to improve matching
-        s = (s.replace("أ", "ا")
-               .replace("إ", "ا")
-               .replace("آ", "ا")
-               .replace("ى", "ي")
-               .replace("ؤ", "و")
-               .replace("ئ", "ي")
-               .replace("ة", "ه"))
-        return s.strip().lower()
-
-    q_norm = _normalize_ar(q) if q else None
-
-    qset = (
-        db.query(Crop)
-        .options(
-            joinedload(Crop.seller).load_only(User.id, User.name, User.phone),
-            selectinload(Crop.media),
-        )
+    if sort == CropSort.distance and not filters.near:
+        raise HTTPException(400, "distance sort requires near")
+    requested = _fieldset(fields, extra=("distance_km",))
+    # list items are cards unless ?fields= asks for more (images, notes, seller_*)
+    fieldset = requested or CARD_FIELDS
+
+    # serialized pages are cached per (filters, sort, page) and table versions;
+    # base_url is part of the key because image URLs are absolute
+    cache_key = response_cache.key(
+        "crops:list",
+        (filters, sort, limit, offset, page, cursor, total_mode, fieldset, str(request.base_url)),
+        CACHE_TABLES,
+    )
+    cached = _cache_get(request, cache_key)
+    if cached is not MISSING:
+        return _conditional(request, cached["etag"], cached["body"].encode())
+
+    # keyset mode: cursor carries the last row's (sort key, id); it wins over offset/page
+    after = None
+    if cursor and sort in (CropSort.relevance, CropSort.distance):
+        raise HTTPException(400, f"cursor is not supported for {sort.value} sort")
+    if cursor:
+        try:
+            cursor_sort, after = decode_cursor(cursor)
+        except InvalidCursor:
+            raise HTTPException(400, "invalid cursor")
+        if cursor_sort != sort.value:
+            raise HTTPException(400, "cursor does not match sort")
+        if sort == CropSort.newest:
+            try:
+                after[0] = datetime.fromisoformat(after[0])
+            except (TypeError, ValueError):
+                raise HTTPException(400, "invalid cursor")
+        elif not isinstance(after[0], (int, float)):
+            raise HTTPException(400, "invalid cursor")
+        offset = None
+        page = None
+    elif offset is None and page is not None:
+        offset = (page - 1) * limit
+
+    return await db.run_sync(
+        _list_page, request, filters, sort, limit, offset, page, after, total_mode, fieldset, requested, cache_key,
     )
 
-    # filters
-    if type_:
-        qset = qset.filter(Crop.type == type_)
-    if state_norm:
-        qset = qset.filter(Crop.state == state_norm)
-    if min_price is not None:
-        qset = qset.filter(Crop.price >= min_price)
-    if max_price is not None:
-        qset = qset.filter(Crop.price <= max_price)
-
-    # --- NEW: search filter (ILIKE on normalized text)
-    if q_norm:
-        # We normalize the DB columns on the fly similarly (lower + simple char mapping).
-        # NOTE: For performance, we’ll add indexes in Step 2.
-        def norm_col(col):
-            # lower(...) then chain replace(...) like our Python normalize
-            return func.lower(
-                func.replace(
-                    func.replace(
-                        func.replace(
-                            func.replace(
-                                func.replace(
-                                    func.replace(col, "أ", "ا"), "إ", "ا"
-                                ),
-                                "آ", "ا"
-                            ),
-                            "ى", "ي"
-                        ),
-                        "ؤ", "و"
-                    ),
-                    "ئ", "ي"
-                )
-            )
 
-        pat = f"%{q_norm}%"
-        qset = qset.filter(
-            or_(
-                norm_col(Crop.name).ilike(pat),
-                norm_col(Crop.type).ilike(pat),
-                norm_col(Crop.state).ilike(pat),
-            )
-        )
+def _list_page(
+    db: Session,
+    request: Request,
+    filters: CropFilters,
+    sort: CropSort,
+    limit: int,
+    offset: Optional[int],
+    page: Optional[int],
+    after: Optional[list],
+    total_mode: TotalMode,
+    fieldset: tuple[str, ...],
+    requested: Optional[tuple[str, ...]],
+    cache_key: str,
+) -> Response:
+    """The query half of list_crops; runs on the async session via run_sync."""
+    # columns the cursor / distance_km need even when not requested as fields
+    extra_columns = ("price",) if sort in (CropSort.price_asc, CropSort.price_desc) else ("created_at",)
+    want_distance = filters.near is not None and (requested is None or "distance_km" in requested)
+    if want_distance:
+        extra_columns += ("lat", "lng")
+
+    qset = db.query(Crop).options(*crop_load_options(fieldset, extra_columns))
+    qset = apply_filters(db, qset, filters)
+    dialect = db.get_bind().dialect.name
 
     # total BEFORE pagination
-    total = qset.count()
+    if total_mode == TotalMode.exact:
+        total = count_exact(qset)
+    elif total_mode == TotalMode.estimate:
+        total = count_estimate(db, qset)
+    else:
+        total = None
 
-    # sorting (unchanged)
+    # sorting
     if sort == CropSort.newest:
         qset = qset.order_by(Crop.created_at.desc(), Crop.id.desc())
     elif sort == CropSort.price_asc:
         qset = qset.order_by(Crop.price.asc(), Crop.id.desc())
     elif sort == CropSort.price_desc:
         qset = qset.order_by(Crop.price.desc(), Crop.id.desc())
+    elif sort == CropSort.relevance:
+        if filters.q:
+            qset = qset.order_by(search_rank(filters.q, dialect).desc(), Crop.created_at.desc(), Crop.id.desc())
+        else:
+            qset = qset.order_by(Crop.created_at.desc(), Crop.id.desc())
+    elif sort == CropSort.distance:
+        lat, lng = filters.near
+        qset = qset.filter(Crop.lat.isnot(None), Crop.lng.isnot(None)).order_by(
+            distance_km(lat, lng, dialect).asc(), Crop.id.desc()
+        )
 
-    rows = qset.offset(offset).limit(limit).all()
+    if after is not None:
+        value, last_id = after
+        if sort == CropSort.newest:
+            col, ahead = Crop.created_at, Crop.created_at < value
+        elif sort == CropSort.price_asc:
+            col, ahead = Crop.price, Crop.price > value
+        else:
+            col, ahead = Crop.price, Crop.price < value
+        # id is always the descending tie-breaker
+        qset = qset.filter(or_(ahead, and_(col == value, Crop.id < last_id)))
+
+    # one extra row tells us whether another page exists
+    page_rows = with_main(qset).offset(offset).limit(limit + 1).all()
+    has_more = len(page_rows) > limit
+    rows = [c for c, _ in page_rows[:limit]]
+    mains = [m for _, m in page_rows[:limit]]
+
+    next_cursor = None
+    if has_more and rows and sort not in (CropSort.relevance, CropSort.distance):
+        last = rows[-1]
+        key = last.created_at if sort == CropSort.newest else last.price
+        next_cursor = encode_cursor(sort.value, (key, last.id))
+
+    # weak: same rows/versions, but float/order details of the JSON may differ
+    etag = make_etag(
+        (str(request.base_url), filters.near, fieldset, total, next_cursor, [crop_fingerprint(c, m) for c, m in zip(rows, mains)]),
+        weak=True,
+    )
+    if not_modified(request, etag):
+        return _conditional(request, etag, None)
+
+    items = CropSerializer(request, fieldset).many(rows, mains)
+    if want_distance:
+        lat, lng = filters.near
+        for item, c in zip(items, rows):
+            item["distance_km"] = (
+                round(haversine_km(lat, lng, c.lat, c.lng), 2)
+                if c.lat is not None and c.lng is not None else None
+            )
 
-    return {
-        "items": [serialize_crop(c, request) for c in rows],
+    body = render_json({
+        "items": items,
         "page": page,
         "limit": limit,
         "total": total,
+        "next_cursor": next_cursor,
+    })
+    response_cache.set(cache_key, {"etag": etag, "body": body.decode()})
+    return _conditional(request, etag, body)
+
+
+@router.get("/clusters", response_model=dict)
+@limiter.limit("60/minute")
+def list_crop_clusters(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    filters: CropFilters = Depends(crop_filters),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+):
+    if not filters.bbox:
+        raise HTTPException(400, "bbox is required")
+    return {
+        "zoom": zoom,
+        "cell_deg": cluster_cell_deg(zoom),
+        "clusters": crop_clusters(db, filters, zoom),
     }
 
 
-@router.get("/{crop_id}", response_model=dict)
+@router.get("/facets", response_model=dict)
+@limiter.limit("60/minute")
+def list_crop_facets(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    filters: CropFilters = Depends(crop_filters),
+    price_edges: Optional[str] = Query(None, description="Ascending bucket edges, e.g. 100,500,1000"),
+):
+    edges = DEFAULT_PRICE_EDGES
+    if price_edges:
+        edges = _parse_floats(price_edges, None, "price_edges")
+        if list(edges) != sorted(set(edges)) or len(edges) > 20:
+            raise HTTPException(400, "invalid price_edges")
+
+    key = response_cache.key("crops:facets", (filters, edges), CACHE_TABLES)
+    out = _cache_get(request, key)
+    if out is MISSING:
+        out = crop_facets(db, filters, edges)
+        response_cache.set(key, out, ttl=settings.facets_cache_ttl_seconds)
+    return out
+
+
+@router.get("/stats", response_model=dict)
 @limiter.limit("60/minute")
-def get_crop(request: Request, crop_id: int, db: Session = Depends(get_db)):
-    c = (
-        db.query(Crop)
-        .options(selectinload(Crop.media), joinedload(Crop.seller))
-        .filter(Crop.id == crop_id)
-        .first()
+def crop_price_stats(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_read_db),
+    type_: Optional[str] = Query(default=None, alias="type"),
+    state: Optional[str] = Query(default=None),
+    days: int = Query(30, ge=1, le=365, description="Window of listing creation dates"),
+):
+    # reads the crop_price_daily rollup only; crops are scanned by the refresh,
+    # which never runs inside the request (the migration seeds the rollup)
+    wm = price_rollup_watermark(db)
+    if price_rollup_stale(wm):
+        background_tasks.add_task(refresh_price_rollup_detached)
+
+    state = state.strip().title() if state else None
+    return {
+        "type": type_,
+        "state": state,
+        "days": days,
+        **price_stats(db, type_, state, days),
+        "as_of": wm.refreshed_at.isoformat() if wm is not None else None,
+    }
+
+
+@router.get("/suggest", response_model=dict)
+@limiter.limit("120/minute")
+def suggest_crops(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    prefix: str = Query(..., min_length=1, max_length=80),
+    limit: int = Query(10, ge=1, le=20),
+):
+    # answered from memory; only a cold worker's first call reads crops
+    crop_suggest_index.refresh(db)
+    return {"prefix": prefix, "items": crop_suggest_index.suggest(normalize_ar(prefix), limit)}
+
+
+# GET keeps URLs short; long lists (favorites, order history) go through POST
+BATCH_GET_MAX = 100
+
+
+def _batch(request: Request, db: Session, ids: list[int], fields: Optional[str]) -> Response:
+    """Cards for `ids` in request order (duplicates dropped) plus the ids that don't exist."""
+    fieldset = _fieldset(fields) or CARD_FIELDS
+    ids = list(dict.fromkeys(ids))
+
+    cache_key = response_cache.key("crops:batch", (tuple(ids), fieldset, str(request.base_url)), CACHE_TABLES)
+    cached = _cache_get(request, cache_key)
+    if cached is not MISSING:
+        return _conditional(request, cached["etag"], cached["body"].encode())
+
+    rows = (
+        with_main(db.query(Crop).options(*crop_load_options(fieldset)))
+        .filter(Crop.id.in_(ids))
+        .all()
+    )
+    found = {c.id: (c, m) for c, m in rows}
+    hits = [found[i] for i in ids if i in found]
+    missing = [i for i in ids if i not in found]
+
+    etag = make_etag(
+        (str(request.base_url), fieldset, missing, [crop_fingerprint(c, m) for c, m in hits]),
+        weak=True,
     )
-    if not c:
+    if not_modified(request, etag):
+        return _conditional(request, etag, None)
+
+    items = CropSerializer(request, fieldset).many([c for c, _ in hits], [m for _, m in hits])
+    body = render_json({"items": items, "missing": missing})
+    response_cache.set(cache_key, {"etag": etag, "body": body.decode()})
+    return _conditional(request, etag, body)
+
+
+@router.get("/batch", response_model=dict)
+@limiter.limit("60/minute")
+def get_crops_batch(
+    request: Request,
+    db: Session = Depends(get_read_db),
+    ids: str = Query(..., description=f"Comma-separated crop ids (max {BATCH_GET_MAX})"),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of item fields"),
+):
+    try:
+        parsed = [int(i) for i in ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(400, "invalid ids")
+    if not parsed or len(parsed) > BATCH_GET_MAX:
+        raise HTTPException(400, f"ids must list 1..{BATCH_GET_MAX} crops")
+    return _batch(request, db, parsed, fields)
+
+
+@router.post("/batch", response_model=dict)
+@limiter.limit("60/minute")
+def post_crops_batch(request: Request, payload: CropBatchIn, db: Session = Depends(get_read_db)):
+    return _batch(request, db, payload.ids, payload.fields)
+
+
+@router.get("/{crop_id}", response_model=dict)
+@limiter.limit("60/minute")
+async def get_crop(
+    request: Request,
+    crop_id: int,
+    db: AsyncSession = Depends(get_async_read_db),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of crop fields"),
+):
+    fieldset = _fieldset(fields)
+    cache_key = response_cache.key("crops:detail", (crop_id, fieldset, str(request.base_url)), CACHE_TABLES)
+    cached = _cache_get(request, cache_key)
+    if cached is not MISSING:
+        return _conditional(request, cached["etag"], cached["body"].encode())
+
+    row = await db.run_sync(get_crop_with_main, crop_id, crop_load_options(fieldset))
+    if not row:
         raise HTTPException(status_code=404, detail="crop not found")
-    return serialize_crop(c, request)
+    c, main = row
+
+    etag = make_etag((str(request.base_url), fieldset, crop_fingerprint(c, main)))
+    if not_modified(request, etag):
+        return _conditional(request, etag, None)
+
+    body = render_json(CropSerializer(request, fieldset).one(c, main))
+    response_cache.set(cache_key, {"etag": etag, "body": body.decode()})
+    return _conditional(request, etag, body)
@@ -1,17 +1,18 @@
 # app/routers/media.py
+import hashlib
+
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, Request
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.schemas.media import MediaOut
-from app.services.media_service import (
-    upload_image_to_s3,
-    create_media_record,
-    set_main_for_crop,
-    get_media_url,
-    delete_media_from_s3,
-)
+from app.services import image_pipeline
+from app.services.media_ingest import ingest_image
+from app.services.media_service import get_media_url
 from app.models.crop import Crop
 from app.core.ratelimit import limiter
+from app.core.threadpool import run_io
+from app.utils.serializers import media_variant_urls
+from app.utils.uploads import UploadTooLarge, discard, spool_upload
 
 router = APIRouter(prefix="/media", tags=["media"])
 
@@ -31,40 +32,45 @@ async def upload_media(
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(400, "File must be an image")
 
-    blob = await file.read()
-    if len(blob) > MAX_BYTES:
-        raise HTTPException(413, "Image too large (max 10MB)")
-
     # 2) Ensure crop exists
     crop = db.get(Crop, crop_id)
 
     if not crop:
         raise HTTPException(404, "Crop not found")
 
-    # 3) Upload to storage
-    filename, width, height = upload_image_to_s3(blob)
-
-    # 4) Create DB row
-    media = create_media_record(
-        db,
-        crop_id=crop_id,
-        rel_path=filename,  # store relative name only
-        width=width,
-        height=height,
-        is_main=is_main,
-    )
-
-    # 5) If main, unset other mains
-    if is_main:
-        set_main_for_crop(db, media)
+    # 3) Spool to a temp file on the upload threads, a chunk at a time with
+    # the cap enforced while reading; the upload is never one bytes object.
+    # The content hash is computed on the way through.
+    digest = hashlib.sha256()
+    try:
+        tmp_path = await run_io(spool_upload, file.file, MAX_BYTES, None, digest)
+    except UploadTooLarge:
+        raise HTTPException(413, "Image too large (max 10MB)")
+    finally:
+        await file.close()
+
+    # 4-6) Known bytes reuse the stored blob; new ones are processed in the
+    # image pool (bounded; 429 when full) and stored. Then the DB row, made
+    # main if asked, committed on the threadpool.
+    try:
+        media = await ingest_image(db, tmp_path, digest.hexdigest(), crop_id=crop_id, is_main=is_main)
+    except image_pipeline.PipelineBusy:
+        raise HTTPException(429, "Image processing is busy, retry shortly", headers={"Retry-After": "5"})
+    except ValueError:
+        raise HTTPException(400, "File must be an image")
+    finally:
+        discard(tmp_path)
 
-    db.commit()
     db.refresh(media)
 
-    # Build URL (client will GET this)
+    # Build URLs (client will GET these)
+    url = get_media_url(media.path)
+    thumb_url, srcset = media_variant_urls(media, url)
     return MediaOut(
         id=media.id,
-        url=get_media_url(media.path),
+        url=url,
+        thumb_url=thumb_url,
+        srcset=srcset,
         is_main=media.is_main,
         width=media.width,
         height=media.height,
@@ -104,16 +110,20 @@ def list_media_for_crop(
         .order_by(Media.is_main.desc(), Media.created_at.desc())
         .all()
     )
-    return [
-        {
+    out = []
+    for m in rows:
+        url = get_media_url(m.path)
+        thumb_url, srcset = media_variant_urls(m, url)
+        out.append({
             "id": m.id,
-            "url": get_media_url(m.path),
+            "url": url,
+            "thumb_url": thumb_url,
+            "srcset": srcset,
             "is_main": m.is_main,
             "width": m.width,
             "height": m.height,
-        }
-        for m in rows
-    ]
+        })
+    return out
 
 
 @limiter.limit("60/minute")
@@ -129,9 +139,8 @@ def delete_media(request: Request, media_id: int, db: Session = Depends(get_db))
             400, "Cannot delete main image; set another one as main first"
         )
 
-    # delete from storage (best-effort)
-    delete_media_from_s3(m.path)
-
+    # objects shared with other uploads of the same bytes stay until the
+    # last reference goes; then they're deleted after commit (app/db/media_refs.py)
     db.delete(m)
     db.commit()
     return {"ok": True}
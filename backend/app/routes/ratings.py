@@ -2,7 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.api.deps import get_current_user
 from app.schemas.rating import RatingCreate, RatingOut
 from app.repositories import rating as crud_rating  # <-- correct import
@@ -22,7 +22,7 @@ def create_rating(
         raise HTTPException(status_code=400, detail="You already rated this seller/crop")
 
 @router.get("/seller/{seller_id}")
-def get_seller_ratings(seller_id: int, db: Session = Depends(get_db)):
+def get_seller_ratings(seller_id: int, db: Session = Depends(get_read_db)):
     row = crud_rating.get_seller_average(db, seller_id)
     return {
         "avg": round(float(row.avg or 0), 1),
@@ -32,8 +32,15 @@ class CropOut(BaseModel):
     location: LocationIn
     notes: Optional[str] = None
     image_url: Optional[str] = None
+    thumb_url: Optional[str] = None
+    srcset: Optional[dict[str, str]] = None
     images: list[str] = []              # NEW
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class CropBatchIn(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=500)
+    fields: Optional[str] = None
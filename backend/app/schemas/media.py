@@ -3,6 +3,8 @@ from pydantic import BaseModel
 class MediaOut(BaseModel):
     id: int
     url: str
+    thumb_url: str | None = None
+    srcset: dict[str, str] | None = None
     is_main: bool
     width: int | None
     height: int | None
@@ -0,0 +1,40 @@
+# backend/app/scripts/import_crops.py
+"""
+Bulk-import crops from a CSV or NDJSON file for one seller:
+
+    python -m app.scripts.import_crops harvest.csv --seller-id 12 [--dry-run]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+from app.db.session import get_session_factory
+from app.services.crop_import import FORMATS, import_crops
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("path", help="CSV or NDJSON file ('-' for stdin)")
+    parser.add_argument("--seller-id", type=int, required=True)
+    parser.add_argument("--format", choices=FORMATS, help="default: from the file extension")
+    parser.add_argument("--dry-run", action="store_true", help="validate only")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+    db = get_session_factory()()
+    try:
+        report = import_crops(db, stream, fmt, args.seller_id, dry_run=args.dry_run)
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(json.dumps(report.as_dict(), ensure_ascii=False, indent=2))
+    return 0 if not report.errors else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
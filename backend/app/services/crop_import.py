@@ -0,0 +1,167 @@
+# app/services/crop_import.py
+"""
+Bulk crop import (POST /crops/import and `python -m app.scripts.import_crops`).
+
+Rows are read from a text stream one at a time, validated against
+CropCreate and written in batches: COPY on Postgres/psycopg, a single
+executemany INSERT elsewhere. Invalid rows are reported, not fatal; valid
+rows are committed together at the end.
+"""
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, TextIO
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db.versioning import mark_written
+from app.models.crop import Crop
+from app.schemas.crop import CropCreate
+from app.utils.text import crop_search_text
+
+FORMATS = ("csv", "ndjson")
+BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# CSV header: name,type,qty,price,unit,lat,lng,state,locality,address,notes
+# (location.* flattened); NDJSON lines use the CropCreate shape as is
+_LOCATION_KEYS = ("lat", "lng", "state", "locality", "address")
+_INSERT_COLUMNS = (
+    "name", "type", "qty", "price", "unit", "seller_id",
+    "lat", "lng", "state", "locality", "address", "notes", "search_text",
+)
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool = False
+    total: int = 0
+    valid: int = 0
+    imported: int = 0
+    errors: list[dict] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def error(self, row: int, messages: list[str]) -> None:
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "errors": messages})
+        else:
+            self.errors_truncated = True
+
+    def as_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "total": self.total,
+            "valid": self.valid,
+            "imported": self.imported,
+            "failed": self.total - self.valid,
+            "errors": self.errors,
+            "errors_truncated": self.errors_truncated,
+        }
+
+
+def format_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    ct = (content_type or "").split(";")[0].strip().lower()
+    if ct in ("text/csv", "application/csv"):
+        return "csv"
+    if ct in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return "ndjson"
+    return None
+
+
+def _csv_record(row: dict) -> dict:
+    vals = {k: (v.strip() or None) if isinstance(v, str) else v for k, v in row.items() if k}
+    rec = {k: v for k, v in vals.items() if k not in _LOCATION_KEYS}
+    rec["location"] = {k: vals.get(k) for k in _LOCATION_KEYS}
+    return rec
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, object]]:
+    """Yields (row number, record dict | error message); row numbers are 1-based data rows."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for n, row in enumerate(reader, start=1):
+            if None in row:
+                yield n, "too many columns"
+            else:
+                yield n, _csv_record(row)
+        return
+
+    n = 0
+    for line in stream:
+        if not line.strip():
+            continue
+        n += 1
+        try:
+            rec = json.loads(line)
+        except ValueError:
+            yield n, "invalid JSON"
+            continue
+        yield n, rec if isinstance(rec, dict) else "expected a JSON object"
+
+
+def _to_row(data: CropCreate, seller_id: int) -> tuple:
+    # mirrors create_crop; Core inserts skip the ORM's search_text listener
+    state = data.location.state.strip().title() if data.location.state else None
+    return (
+        data.name, data.type, float(data.qty), float(data.price), data.unit, seller_id,
+        data.location.lat, data.location.lng, state, data.location.locality,
+        data.location.address, data.notes, crop_search_text(data.name, data.type, state),
+    )
+
+
+def _write_batch(db: Session, rows: list[tuple]) -> None:
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg":
+        cursor = db.connection().connection.cursor()
+        try:
+            with cursor.copy(f"COPY crops ({', '.join(_INSERT_COLUMNS)}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+        finally:
+            cursor.close()
+        mark_written(db, "crops")
+    else:
+        db.execute(insert(Crop), [dict(zip(_INSERT_COLUMNS, row)) for row in rows])
+
+
+def import_crops(db: Session, stream: TextIO, fmt: str, seller_id: int, dry_run: bool = False) -> ImportReport:
+    if fmt not in FORMATS:
+        raise ValueError(f"unsupported format: {fmt}")
+    report = ImportReport(dry_run=dry_run)
+    batch: list[tuple] = []
+    try:
+        for n, rec in iter_records(stream, fmt):
+            report.total += 1
+            if isinstance(rec, str):
+                report.error(n, [rec])
+                continue
+            try:
+                data = CropCreate.model_validate(rec)
+            except ValidationError as e:
+                report.error(n, [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()])
+                continue
+            if not data.type:
+                # optional in CropCreate, but crops.type is NOT NULL; one bad
+                # row must not fail the whole batch insert
+                report.error(n, ["type: Field required"])
+                continue
+            report.valid += 1
+            if dry_run:
+                continue
+            batch.append(_to_row(data, seller_id))
+            if len(batch) >= BATCH_SIZE:
+                _write_batch(db, batch)
+                batch.clear()
+        if batch:
+            _write_batch(db, batch)
+        if not dry_run:
+            db.commit()
+            report.imported = report.valid
+    except Exception:
+        db.rollback()
+        raise
+    return report
@@ -0,0 +1,118 @@
+# app/services/image_pipeline.py
+"""
+Image processing for POST /media/upload, off the event loop.
+
+Decode / transpose / resize / encode (WebP + JPEG derivatives) run in a small process pool
+(IMAGE_WORKERS; 0 = a thread on the upload limiter, for dev and tests).
+Admission is bounded: at most IMAGE_QUEUE_MAX images may be queued or in
+progress per worker process, beyond that `process_image` raises
+PipelineBusy and the route answers 429 with Retry-After, so an upload burst
+queues in the clients instead of in our memory.
+
+Per-stage durations go to the `image_pipeline_stage_seconds` histogram
+(stage = queue, decode, transpose, resize, encode, store).
+"""
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Optional, Union
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+from app.core.threadpool import run_io
+from app.services import media_service
+from app.utils.images import Derivative, process_image_timed
+
+STAGE_SECONDS = Histogram(
+    "image_pipeline_stage_seconds",
+    "Time spent per image pipeline stage",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+IN_FLIGHT = Gauge("image_pipeline_in_flight", "Images queued or being processed")
+REJECTED = Counter("image_pipeline_rejected_total", "Uploads rejected because the image queue was full")
+
+
+class PipelineBusy(Exception):
+    pass
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+# only touched on the event loop, with no await between check and update
+_in_flight = 0
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if settings.image_workers <= 0:
+        return None
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a process that runs threads (anyio, DB pools) is unsafe
+                _executor = ProcessPoolExecutor(
+                    max_workers=settings.image_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def admission_limit() -> int:
+    """Images queued or in progress before PipelineBusy: IMAGE_QUEUE_MAX per worker (the thread fallback counts as one)."""
+    return settings.image_queue_max * max(1, settings.image_workers)
+
+
+async def process_image(source: Union[bytes, str]) -> list[Derivative]:
+    """
+    `source` is a spooled upload's path (preferred: only the path crosses to
+    the worker) or bytes. Returns the derivatives, smallest first; raises
+    PipelineBusy or ValueError (not an image).
+    """
+    global _in_flight
+    if _in_flight >= admission_limit():
+        REJECTED.inc()
+        raise PipelineBusy()
+    _in_flight += 1
+    IN_FLIGHT.inc()
+    try:
+        start = perf_counter()
+        executor = _get_executor()
+        if executor is None:
+            result = await run_io(process_image_timed, source)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                executor, process_image_timed, source
+            )
+        derivatives, timings = result
+        # whatever the worker didn't spend on the image: waiting for a
+        # worker plus shipping the bytes across
+        timings["queue"] = max(0.0, perf_counter() - start - sum(timings.values()))
+        for stage, seconds in timings.items():
+            STAGE_SECONDS.labels(stage).observe(seconds)
+        return derivatives
+    finally:
+        _in_flight -= 1
+        IN_FLIGHT.dec()
+
+
+async def store_image(derivatives: list[Derivative], stem: Optional[str] = None) -> tuple[str, list[dict]]:
+    """(main key, Media.variants) - see media_service.store_derivatives."""
+    start = perf_counter()
+    try:
+        return await run_io(media_service.store_derivatives, derivatives, stem)
+    finally:
+        STAGE_SECONDS.labels("store").observe(perf_counter() - start)
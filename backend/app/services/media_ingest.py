@@ -0,0 +1,148 @@
+# app/services/media_ingest.py
+"""
+Content-addressed image storage.
+
+Uploads are keyed by the sha256 of their original bytes (hashed while
+spooling, see app/utils/uploads.spool_upload). The first upload of some
+bytes is processed and stored under media/<h[:2]>/<h>-<nonce>...; every
+later one just bumps MediaBlob.refcount and gets a Media row pointing at the
+same objects, with no reprocessing and no new bytes in storage. Deleting a
+Media row drops the count, and the objects go once nothing references them
+(app/db/media_refs.py).
+"""
+from __future__ import annotations
+
+import logging
+import secrets
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.db.media_refs import track_stored, untrack_stored
+from app.models.media import Media, MediaBlob
+from app.services import image_pipeline
+from app.services.media_service import (
+    create_media_record,
+    delete_media_objects,
+    media_keys,
+    set_main_for_crop,
+)
+
+log = logging.getLogger("mahaseel")
+
+
+def blob_stem(content_hash: str) -> str:
+    # two-char fan-out keeps local directories (and S3 listings) small; the
+    # nonce gives every blob row its own keys, so purging a released blob
+    # can't delete the objects of a re-upload stored in the meantime
+    return f"media/{content_hash[:2]}/{content_hash}-{secrets.token_hex(4)}"
+
+
+def _claim_blob(db: Session, content_hash: str) -> Optional[MediaBlob]:
+    """Take a reference on an existing blob (atomic increment), or None if there is none."""
+    res = db.execute(
+        update(MediaBlob)
+        .where(MediaBlob.hash == content_hash)
+        .values(refcount=MediaBlob.refcount + 1)
+    )
+    if not res.rowcount:
+        return None
+    return db.get(MediaBlob, content_hash, populate_existing=True)
+
+
+def _drop_copy(db: Session, blob: MediaBlob) -> None:
+    keys = media_keys(blob)
+    untrack_stored(db, keys)
+    delete_media_objects(keys)
+
+
+def _register_blob(db: Session, blob: MediaBlob) -> MediaBlob:
+    try:
+        with db.begin_nested():
+            db.add(blob)
+    except IntegrityError:
+        # a concurrent upload of the same bytes got there first: share its
+        # row and drop the copy we just stored
+        claimed = _claim_blob(db, blob.hash)
+        if claimed is None:
+            raise
+        _drop_copy(db, blob)
+        return claimed
+    return blob
+
+
+def _attach(
+    db: Session,
+    content_hash: str,
+    blob: Optional[MediaBlob],
+    crop_id: int,
+    is_main: bool,
+) -> Optional[Media]:
+    """
+    Reference the stored blob for `content_hash` (registering `blob`, freshly
+    stored, if nobody has) and commit its Media row. None if there is no blob
+    and `blob` wasn't given: the caller has to process the bytes first.
+    """
+    claimed = _claim_blob(db, content_hash)
+    if claimed is None:
+        if blob is None:
+            return None
+        claimed = _register_blob(db, blob)
+    elif blob is not None:
+        # registered by a concurrent upload while we were processing
+        _drop_copy(db, blob)
+
+    media = create_media_record(
+        db,
+        crop_id=crop_id,
+        rel_path=claimed.path,
+        width=claimed.width,
+        height=claimed.height,
+        is_main=is_main,
+        variants=claimed.variants,
+        content_hash=claimed.hash,
+    )
+    if is_main:
+        set_main_for_crop(db, media)
+    db.commit()
+    return media
+
+
+async def ingest_image(
+    db: Session,
+    src_path: str,
+    content_hash: str,
+    *,
+    crop_id: int,
+    is_main: bool = False,
+) -> Media:
+    """
+    Committed Media row for the spooled upload at `src_path`, processing and
+    storing it only if these bytes were never seen. Raises
+    image_pipeline.PipelineBusy and ValueError (not an image) like
+    process_image.
+
+    The blob UPDATE / INSERT run on the threadpool and are committed there,
+    so their row locks are never held across an await: a second upload of
+    the same bytes waits on a thread, not on the event loop the first one
+    needs to finish.
+    """
+    media = await run_in_threadpool(_attach, db, content_hash, None, crop_id, is_main)
+    if media is None:
+        derivatives = await image_pipeline.process_image(src_path)
+        path, variants = await image_pipeline.store_image(derivatives, blob_stem(content_hash))
+        blob = MediaBlob(
+            hash=content_hash,
+            path=path,
+            width=derivatives[-1].width,
+            height=derivatives[-1].height,
+            variants=variants,
+            refcount=1,
+        )
+        # deleted again if the row never commits (app/db/media_refs.py)
+        track_stored(db, media_keys(blob))
+        media = await run_in_threadpool(_attach, db, content_hash, blob, crop_id, is_main)
+    return media
@@ -1,47 +1,30 @@
 # app/services/media_service.py
 from io import BytesIO
+import logging
 import os
 import uuid
+from typing import Optional
 
-import boto3
 import clamd
-from PIL import Image, ImageOps, UnidentifiedImageError
 from sqlalchemy.orm import Session
-from app.core.config import settings  # however you load settings
 from urllib.parse import urljoin
 
+from app.core import storage
 from app.models.media import Media
+from app.utils.images import Derivative, process_image_timed
 
 
-S3_BUCKET = os.getenv("S3_BUCKET", "")
+log = logging.getLogger("mahaseel")
+
 CDN_BASE_URL = os.getenv("CDN_BASE_URL", "")
 CLAMD_HOST = os.getenv("CLAMD_HOST", "localhost")
 CLAMD_PORT = int(os.getenv("CLAMD_PORT", "3310"))
 
 
-def _process_image(file_bytes: bytes) -> tuple[bytes, int, int]:
-    """Decode, normalize orientation, downscale and encode to JPEG."""
-    try:
-        img = Image.open(BytesIO(file_bytes))
-        img.load()
-    except (UnidentifiedImageError, OSError) as e:
-        raise ValueError("invalid image") from e
-
-    try:
-        img = ImageOps.exif_transpose(img)
-    except Exception:
-        pass
-
-    if img.mode not in ("RGB", "L"):
-        img = img.convert("RGB")
-
-    img.thumbnail((1200, 1200), Image.LANCZOS)
-    width, height = img.size
-
-    buf = BytesIO()
-    img.save(buf, format="JPEG", quality=85, optimize=True)
-    buf.seek(0)
-    return buf.read(), width, height
+def _process_image(file_bytes: bytes) -> list[Derivative]:
+    """Decode, normalize orientation and build the WebP/JPEG derivatives (smallest first)."""
+    derivatives, _ = process_image_timed(file_bytes)
+    return derivatives
 
 
 def _scan_bytes(data: bytes) -> None:
@@ -57,39 +40,57 @@ def _scan_bytes(data: bytes) -> None:
         pass
 
 
+def store_derivatives(derivatives: list[Derivative], stem: Optional[str] = None) -> tuple[str, list[dict]]:
+    """
+    Scan and store processed derivatives in the media backend under `stem`
+    (random when not given). Returns the main key (the largest JPEG,
+    `<stem>.jpg`) and the Media.variants list:
+    [{"w", "h", "webp": key, "jpeg": key}, ...] smallest first.
+    """
+    main = derivatives[-1]
+    _scan_bytes(main.jpeg)
+    stem = stem or uuid.uuid4().hex
+    objects = []
+    variants = []
+    for d in derivatives:
+        webp_key = f"{stem}_{d.width}.webp"
+        jpeg_key = f"{stem}.jpg" if d is main else f"{stem}_{d.width}.jpg"
+        objects += [(webp_key, d.webp, "image/webp"), (jpeg_key, d.jpeg, "image/jpeg")]
+        variants.append({"w": d.width, "h": d.height, "webp": webp_key, "jpeg": jpeg_key})
+    storage.media_storage.put_many(objects)
+    return f"{stem}.jpg", variants
+
+
 def upload_image_to_s3(file_bytes: bytes) -> tuple[str, int, int]:
-    """Process, scan and upload image to S3. Returns (key, width, height)."""
-    processed, width, height = _process_image(file_bytes)
-    _scan_bytes(processed)
-    key = f"{uuid.uuid4().hex}.jpg"
-    s3 = boto3.client("s3")
-    s3.upload_fileobj(
-        BytesIO(processed), S3_BUCKET, key, ExtraArgs={"ContentType": "image/jpeg"}
-    )
-    return key, width, height
+    """Process, scan and store an image in the media backend. Returns (key, width, height)."""
+    derivatives = _process_image(file_bytes)
+    key, _ = store_derivatives(derivatives)
+    return key, derivatives[-1].width, derivatives[-1].height
 
 
-def get_media_url(path: str) -> str:
-    # Always normalize to a relative URL for local
-    if getattr(settings, "MEDIA_BACKEND", "local") != "s3":
-        # e.g. "/static/uploads/xyz.jpg"
-        rel = f"{getattr(settings, 'STATIC_URL', '/static').rstrip('/')}/{path.lstrip('/')}"
-        return rel
-    # S3 path (only if bucket configured)
-    bucket = getattr(settings, "S3_BUCKET", "")
-    if not bucket:
-        # fall back instead of crashing
-        rel = f"{getattr(settings, 'STATIC_URL', '/static').rstrip('/')}/{path.lstrip('/')}"
-        return rel
+def media_keys(media: Media) -> list[str]:
+    """Every stored object of a Media row: the main image plus its derivatives."""
+    keys = [media.path]
+    for v in media.variants or []:
+        keys.extend(k for k in (v.get("webp"), v.get("jpeg")) if k and k not in keys)
+    return keys
 
 
+def get_media_url(path: str) -> str:
+    # "/static/<key>" for local storage, an absolute CDN/bucket URL for S3
+    return storage.media_storage.url(path)
 
-def delete_media_from_s3(key: str) -> None:
-    s3 = boto3.client("s3")
+
+def delete_media_objects(keys: list[str]) -> None:
+    """Best-effort batch delete of a media row's objects (see media_keys)."""
     try:
-        s3.delete_object(Bucket=S3_BUCKET, Key=key)
+        storage.media_storage.delete(keys)
     except Exception:
-        pass
+        log.exception("media delete failed")
+
+
+def delete_media_from_s3(key: str) -> None:
+    delete_media_objects([key])
 
 
 def create_media_record(
@@ -100,6 +101,8 @@ def create_media_record(
     width: int,
     height: int,
     is_main: bool = False,
+    variants: list[dict] | None = None,
+    content_hash: str | None = None,
 ) -> Media:
     m = Media(
         crop_id=crop_id,
@@ -107,6 +110,8 @@ def create_media_record(
         width=width,
         height=height,
         is_main=is_main,
+        variants=variants,
+        content_hash=content_hash,
     )
     db.add(m)
     db.flush()
@@ -0,0 +1,33 @@
+# app/utils/cursor.py
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort: str, key: tuple[Any, int]) -> str:
+    """Opaque, url-safe token holding the sort mode and the last row's sort key."""
+    value, row_id = key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "k": [value, row_id]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> tuple[str, list]:
+    """Returns (sort, [value, id]); raises InvalidCursor on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort, key = data["s"], data["k"]
+        if not isinstance(key, list) or len(key) != 2 or not isinstance(key[1], int):
+            raise InvalidCursor("bad cursor key")
+        return sort, key
+    except InvalidCursor:
+        raise
+    except Exception as e:
+        raise InvalidCursor("malformed cursor") from e
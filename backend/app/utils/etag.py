@@ -0,0 +1,50 @@
+# app/utils/etag.py
+import hashlib
+from typing import Any, Iterable, Optional
+
+from fastapi import Request
+
+from app.models.crop import Crop
+
+# updated_at alone is too coarse (SQLite stores whole seconds), so hash the
+# loaded column values too; it is still far cheaper than serializing
+_CROP_COLUMNS = tuple(c.key for c in Crop.__table__.columns)
+
+
+def crop_fingerprint(crop, main=None) -> tuple:
+    """
+    Everything serialize_crop output depends on, taken from already-loaded
+    state only (vars() never triggers a lazy load). `main` is the joined main
+    Media row, when the query used crops_with_main().
+    """
+    loaded = vars(crop)
+    seller = loaded.get("seller")
+    media = sorted((m.id, bool(m.is_main), m.path) for m in (loaded.get("media") or []))
+    return (
+        tuple(loaded.get(k) for k in _CROP_COLUMNS),
+        getattr(seller, "name", None),
+        getattr(seller, "phone", None),
+        tuple(media),
+        (main.id, main.path) if main is not None else None,
+    )
+
+
+def make_etag(parts: Any, weak: bool = False) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 13.1.2)."""
+    header: Optional[str] = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags: Iterable[str] = header.split(",")
+    return any(_opaque(t) == _opaque(etag) for t in tags)
@@ -0,0 +1,24 @@
+# app/utils/geo.py
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEG_LAT = 111.32
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def lng_scale(lat: float) -> float:
+    """Longitude degrees shrink by cos(lat); clamp so the poles don't divide by zero."""
+    return max(math.cos(math.radians(lat)), 1e-6)
+
+
+def bbox_around(lat: float, lng: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lng, min_lat, max_lng, max_lat) box that contains the radius circle."""
+    dlat = radius_km / KM_PER_DEG_LAT
+    dlng = radius_km / (KM_PER_DEG_LAT * lng_scale(lat))
+    return (lng - dlng, lat - dlat, lng + dlng, lat + dlat)
@@ -0,0 +1,85 @@
+# app/utils/images.py
+import math
+from dataclasses import dataclass
+from io import BytesIO
+from time import perf_counter
+from typing import Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# longest edge of each derivative; the largest one is also the main JPEG
+DERIVATIVE_SIZES = (160, 480, 1200)
+JPEG_QUALITY = 85
+WEBP_QUALITY = 80
+
+
+@dataclass
+class Derivative:
+    width: int
+    height: int
+    webp: bytes
+    jpeg: bytes
+
+
+def _draft(img: Image.Image, longest: int) -> None:
+    """
+    Let the JPEG decoder downscale by 1/2, 1/4 or 1/8 while decoding, keeping
+    the longest edge >= `longest`: a 12MP photo then never exists in memory
+    at full resolution. No-op for other formats.
+    """
+    w, h = img.size
+    scale = longest / max(w, h)
+    if scale < 1:
+        img.draft(None, (math.ceil(w * scale), math.ceil(h * scale)))
+
+
+def process_image_timed(source: Union[bytes, str], sizes: tuple[int, ...] = DERIVATIVE_SIZES) -> tuple[list[Derivative], dict[str, float]]:
+    """
+    Decode, normalize orientation, then downscale to each of `sizes` and
+    encode WebP + JPEG. `source` is the upload's bytes or, preferably, a
+    file path (see app/utils/uploads.spool_upload). Returns the derivatives
+    smallest first (sizes larger than the source collapse into one) and
+    seconds per stage.
+
+    Runs in the image process pool (app/services/image_pipeline.py): keep
+    this module free of app imports so the workers start light.
+    """
+    timings: dict[str, float] = {"resize": 0.0, "encode": 0.0}
+    t = perf_counter()
+    try:
+        with Image.open(BytesIO(source) if isinstance(source, bytes) else source) as src:
+            _draft(src, max(sizes))
+            src.load()
+            timings["decode"], t = perf_counter() - t, perf_counter()
+            try:
+                img = ImageOps.exif_transpose(src)
+            except Exception:
+                img = src.copy()
+    except (UnidentifiedImageError, OSError) as e:
+        raise ValueError("invalid image") from e
+    # the decoded original (and its file handle) is released here; only
+    # the transposed copy lives on
+
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+    timings["transpose"] = perf_counter() - t
+
+    out: dict[tuple[int, int], Derivative] = {}
+    # largest first, each step resizing the previous one (cheaper than from
+    # the full-size original, and visually the same at these ratios)
+    for size in sorted(sizes, reverse=True):
+        t = perf_counter()
+        # in place: each step frees the larger pixel buffer it replaces
+        img.thumbnail((size, size), Image.LANCZOS)
+        timings["resize"] += perf_counter() - t
+        if img.size in out:
+            continue
+
+        t = perf_counter()
+        webp, jpeg = BytesIO(), BytesIO()
+        img.save(webp, format="WEBP", quality=WEBP_QUALITY)
+        img.save(jpeg, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        timings["encode"] += perf_counter() - t
+        out[img.size] = Derivative(img.width, img.height, webp.getvalue(), jpeg.getvalue())
+
+    return sorted(out.values(), key=lambda d: d.width * d.height), timings
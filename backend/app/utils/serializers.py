@@ -1,9 +1,12 @@
 # app/utils/serializers.py
 from decimal import Decimal
-from typing import Any, Iterable, Optional
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Optional
 from fastapi import Request
 from urllib.parse import urljoin
 
+import orjson
+
 from app.models.crop import Crop
 from app.services.media_service import get_media_url
 
@@ -35,6 +38,34 @@ def _media_url_abs(request, m):
     return urljoin(str(request.base_url), rel_or_abs.lstrip("/"))
 
 
+def _image_variants(m, url: Callable[[str], Optional[str]], main_url: Optional[str]) -> tuple[Optional[str], Optional[dict]]:
+    """
+    (thumb_url, srcset) of a Media row: the smallest WebP derivative and
+    {"webp": "u 160w, ...", "jpeg": ...}. Images stored before derivatives
+    existed fall back to (main_url, None).
+    """
+    variants = getattr(m, "variants", None) if m is not None else None
+    if not variants:
+        return main_url, None
+    srcset = {
+        fmt: ", ".join(f"{u} {v['w']}w" for v in variants if (u := url(v[fmt])))
+        for fmt in ("webp", "jpeg")
+    }
+    return url(variants[0]["webp"]), srcset
+
+
+def media_variant_urls(m, main_url: Optional[str]) -> tuple[Optional[str], Optional[dict]]:
+    """_image_variants with relative URLs (get_media_url), for media endpoints."""
+    return _image_variants(m, get_media_url, main_url)
+
+
+def _path_url_abs(request: Optional[Request], path: str) -> Optional[str]:
+    rel = get_media_url(path)
+    if rel is None or request is None or rel.startswith(("http://", "https://")):
+        return rel
+    return urljoin(str(request.base_url), rel.lstrip("/"))
+
+
 def _images_array(request: Optional[Request], media_list: Iterable) -> list[str]:
     out: list[str] = []
     for m in media_list:
@@ -51,6 +82,8 @@ def serialize_crop(crop: Crop | tuple, request: Optional[Request] = None) -> dic
     media_list = getattr(crop, "media", None) or []
     main = next((m for m in media_list if getattr(m, "is_main", False)), None)
     images = _images_array(request, media_list)
+    image_url = _media_url_abs(request, main) if main else None
+    thumb_url, srcset = _image_variants(main, lambda p: _path_url_abs(request, p), image_url)
 
     return {
         "id": crop.id,
@@ -70,7 +103,216 @@ def serialize_crop(crop: Crop | tuple, request: Optional[Request] = None) -> dic
             "address": getattr(crop, "address", None),
         },
         "notes": getattr(crop, "notes", None),
-        "image_url": _media_url_abs(request, main) if main else None,
+        "image_url": image_url,
+        "thumb_url": thumb_url,
+        "srcset": srcset,
         "images": images,
         "created_at": crop.created_at,  # <-- add this
     }
+
+
+# --- page-level fast path -------------------------------------------------
+
+# output field -> Crop columns it reads (drives load_only() for ?fields=)
+CROP_FIELD_COLUMNS: dict[str, tuple[str, ...]] = {
+    "id": ("id",),
+    "name": ("name",),
+    "type": ("type",),
+    "qty": ("qty",),
+    "price": ("price",),
+    "unit": ("unit",),
+    "seller_id": ("seller_id",),
+    "seller_name": ("seller_id",),
+    "seller_phone": ("seller_id",),
+    "location": ("lat", "lng", "state", "locality", "address"),
+    "notes": ("notes",),
+    "image_url": (),
+    "thumb_url": (),
+    "srcset": (),
+    "images": (),
+    "created_at": ("created_at",),
+}
+SELLER_FIELDS = frozenset({"seller_name", "seller_phone"})
+MAIN_IMAGE_FIELDS = frozenset({"image_url", "thumb_url", "srcset"})
+MEDIA_FIELDS = MAIN_IMAGE_FIELDS | {"images"}
+
+# default list item: what a card renders. The gallery (images), notes and the
+# seller's name/phone are detail data - still available via ?fields=.
+CARD_FIELDS: tuple[str, ...] = (
+    "id", "name", "type", "qty", "price", "unit", "seller_id", "location",
+    "image_url", "thumb_url", "srcset", "created_at",
+)
+
+
+def parse_fields(raw: Optional[str], extra: tuple[str, ...] = ()) -> Optional[tuple[str, ...]]:
+    """`?fields=a,b` -> canonical-order tuple; None means every field. Raises ValueError on unknown names."""
+    if not raw:
+        return None
+    wanted = {f.strip() for f in raw.split(",") if f.strip()}
+    order = (*CROP_FIELD_COLUMNS, *extra)
+    unknown = wanted.difference(order)
+    if unknown:
+        raise ValueError(", ".join(sorted(unknown)))
+    return tuple(f for f in order if f in wanted)
+
+
+_UNJOINED = object()  # image_url falls back to crop.media
+
+_crop_scalars = attrgetter(
+    "id", "name", "type", "qty", "price", "unit", "seller_id",
+    "lat", "lng", "state", "locality", "address", "notes", "created_at",
+)
+
+
+class CropSerializer:
+    """
+    Same output as serialize_crop, built for whole pages: the base URL is
+    resolved once per request and media URLs are built in one pass over the
+    page (memoized per path) instead of str(request.base_url) + urljoin per
+    image.
+    """
+
+    __slots__ = ("base", "fields", "_urls")
+
+    def __init__(self, request: Optional[Request] = None, fields: Optional[tuple[str, ...]] = None) -> None:
+        self.base = str(request.base_url) if request else None
+        # with a field subset only those attributes are touched, so columns
+        # deferred by load_only() never trigger a lazy load
+        self.fields = fields
+        self._urls: dict[Any, Optional[str]] = {}
+
+    def _absolute(self, rel: Optional[str]) -> Optional[str]:
+        if rel is None or rel.startswith(("http://", "https://")) or self.base is None:
+            return rel
+        return self.base + rel.lstrip("/")
+
+    def _build_url(self, m) -> Optional[str]:
+        return self._absolute(_media_url_rel(m))
+
+    def _prime(self, media: Iterable) -> None:
+        urls = self._urls
+        for m in media:
+            key = getattr(m, "url", None) or m.path
+            if key not in urls:
+                urls[key] = self._build_url(m)
+
+    def _url(self, m) -> Optional[str]:
+        return self._urls[getattr(m, "url", None) or m.path]
+
+    def _path_url(self, path: str) -> Optional[str]:
+        # derivative paths share the memo with main paths
+        urls = self._urls
+        if path not in urls:
+            urls[path] = self._absolute(get_media_url(path))
+        return urls[path]
+
+    def _variants(self, main, main_url: Optional[str]) -> tuple[Optional[str], Optional[dict]]:
+        return _image_variants(main, self._path_url, main_url)
+
+    def _one(self, crop) -> dict:
+        (id_, name, type_, qty, price, unit, seller_id,
+         lat, lng, state, locality, address, notes, created_at) = _crop_scalars(crop)
+        seller = crop.seller
+        media_list = crop.media or []
+        main = None
+        main_m = None
+        images = []
+        for m in media_list:
+            u = self._url(m)
+            if u:
+                images.append(u)
+            if main_m is None and m.is_main:
+                main, main_m = u, m
+        thumb_url, srcset = self._variants(main_m, main)
+        return {
+            "id": id_,
+            "name": name,
+            "type": type_,
+            "qty": float(qty) if type(qty) is Decimal else qty,
+            "price": float(price) if type(price) is Decimal else price,
+            "unit": unit,
+            "seller_id": seller_id,
+            "seller_name": seller.name if seller is not None else None,
+            "seller_phone": seller.phone if seller is not None else None,
+            "location": {
+                "lat": lat,
+                "lng": lng,
+                "state": state,
+                "locality": locality,
+                "address": address,
+            },
+            "notes": notes,
+            "image_url": main,
+            "thumb_url": thumb_url,
+            "srcset": srcset,
+            "images": images,
+            "created_at": created_at,
+        }
+
+    @staticmethod
+    def _main_media(crop):
+        for m in crop.media or []:
+            if m.is_main:
+                return m
+        return None
+
+    def _images(self, crop) -> list[str]:
+        return [u for u in (self._url(m) for m in crop.media or []) if u]
+
+    def _project(self, crop, main=_UNJOINED) -> dict:
+        out = {}
+        if MAIN_IMAGE_FIELDS.intersection(self.fields):
+            if main is _UNJOINED:
+                main = self._main_media(crop)
+            main_url = self._url(main) if main is not None else None
+            thumb_url, srcset = self._variants(main, main_url)
+            main_image = {"image_url": main_url, "thumb_url": thumb_url, "srcset": srcset}
+        for f in self.fields:
+            if f == "location":
+                out[f] = {
+                    "lat": crop.lat,
+                    "lng": crop.lng,
+                    "state": crop.state,
+                    "locality": crop.locality,
+                    "address": crop.address,
+                }
+            elif f in SELLER_FIELDS:
+                seller = crop.seller
+                out[f] = getattr(seller, f[len("seller_"):]) if seller is not None else None
+            elif f in MAIN_IMAGE_FIELDS:
+                out[f] = main_image[f]
+            elif f == "images":
+                out[f] = self._images(crop)
+            elif f in CROP_FIELD_COLUMNS:
+                v = getattr(crop, f)
+                out[f] = float(v) if type(v) is Decimal else v
+        return out
+
+    def many(self, crops: Iterable[Crop], mains: Optional[Iterable] = None) -> list[dict]:
+        """
+        `mains` (parallel to `crops`) carries the main Media row from a
+        *_with_main join; image_url then comes from it instead of crop.media.
+        """
+        crops = list(crops)
+        if self.fields is None:
+            self._prime(m for c in crops for m in (c.media or []))
+            return [self._one(c) for c in crops]
+        if mains is not None:
+            mains = list(mains)
+            self._prime(m for m in mains if m is not None)
+            if "images" in self.fields:
+                self._prime(m for c in crops for m in (c.media or []))
+            return [self._project(c, m) for c, m in zip(crops, mains)]
+        if MEDIA_FIELDS.intersection(self.fields):
+            self._prime(m for c in crops for m in (c.media or []))
+        return [self._project(c) for c in crops]
+
+    def one(self, crop: Crop, main=_UNJOINED) -> dict:
+        if main is _UNJOINED:
+            return self.many([crop])[0]
+        return self.many([crop], [main])[0]
+
+
+def render_json(payload: Any) -> bytes:
+    """orjson encoding for already-shaped payloads (skips response_model re-validation)."""
+    return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
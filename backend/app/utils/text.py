@@ -0,0 +1,27 @@
+# app/utils/text.py
+import re
+from typing import Optional
+
+_TASHKEEL = re.compile(r"[\u064B-\u0652]")
+
+# unify Arabic letter forms so spelling variants match
+_AR_FORMS = str.maketrans({
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ى": "ي",
+    "ؤ": "و",
+    "ئ": "ي",
+    "ة": "ه",
+})
+
+
+def normalize_ar(s: str) -> str:
+    """Strip diacritics (tashkeel), unify letter forms, trim and lowercase."""
+    s = _TASHKEEL.sub("", s)
+    return s.translate(_AR_FORMS).strip().lower()
+
+
+def crop_search_text(name: Optional[str], type_: Optional[str], state: Optional[str]) -> str:
+    """The value stored in crops.search_text; queries normalize `q` with normalize_ar too."""
+    return " ".join(normalize_ar(p) for p in (name, type_, state) if p)
@@ -0,0 +1,58 @@
+# app/utils/uploads.py
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+def copy_capped(
+    src: BinaryIO, dst: BinaryIO, max_bytes: int, chunk_size: int = CHUNK_SIZE, digest: Any = None
+) -> int:
+    """
+    Copy in chunks, raising UploadTooLarge as soon as more than `max_bytes`
+    arrive. A hashlib object passed as `digest` is fed every chunk.
+    """
+    total = 0
+    while chunk := src.read(chunk_size):
+        total += len(chunk)
+        if total > max_bytes:
+            raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+        if digest is not None:
+            digest.update(chunk)
+        dst.write(chunk)
+    return total
+
+
+def save_capped(src: BinaryIO, path: Path, max_bytes: int, digest: Any = None) -> int:
+    """Stream to `path`; a partial file is removed when the cap is hit."""
+    try:
+        with path.open("wb") as out:
+            return copy_capped(src, out, max_bytes, digest=digest)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+
+def spool_upload(src: BinaryIO, max_bytes: int, dir: Optional[str] = None, digest: Any = None) -> str:
+    """
+    Stream an upload into a named temp file and return its path (the caller
+    deletes it). Only one chunk is in memory at a time, and a path - unlike
+    the bytes - is cheap to hand to the image process pool. Pass
+    `digest=hashlib.sha256()` to hash the content on the way through.
+    """
+    fd, path = tempfile.mkstemp(prefix="upload-", dir=dir)
+    os.close(fd)
+    save_capped(src, Path(path), max_bytes, digest=digest)
+    return path
+
+
+def discard(path: Optional[str]) -> None:
+    if path:
+        Path(path).unlink(missing_ok=True)
+
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: per-item cost of serializing a 100-crop page.
+
+    cd backend && JWT_SECRET=x python -m benchmarks.bench_serialize_crop
+
+Compares the legacy path (serialize_crop per item + jsonable_encoder +
+json.dumps, which is what response_model=dict did) with CropSerializer +
+orjson.
+"""
+import json
+import timeit
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from starlette.requests import Request
+
+import app.db.base  # noqa: F401  (configure mappers)
+from app.models import Crop, Media, User
+from app.utils.serializers import CropSerializer, render_json, serialize_crop
+
+PAGE = 100
+IMAGES = 4
+
+
+def _request() -> Request:
+    return Request({
+        "type": "http", "method": "GET", "path": "/crops", "root_path": "",
+        "scheme": "http", "server": ("testserver", 80), "query_string": b"", "headers": [],
+    })
+
+
+def _page() -> list[Crop]:
+    seller = User(id=1, name="مزارع", phone="+249900000001")
+    out = []
+    for i in range(PAGE):
+        c = Crop(
+            id=i, name=f"سمسم {i}", type="حبوب", qty=10.0, price=2500.0, unit="طن",
+            seller_id=1, lat=15.6, lng=32.5, state="الخرطوم", locality="بحري",
+            address="سوق", notes="ملاحظات", created_at=datetime.now(timezone.utc),
+        )
+        c.seller = seller
+        c.media = [Media(id=i * 10 + k, path=f"uploads/{i}_{k}.jpg", is_main=k == 0) for k in range(IMAGES)]
+        out.append(c)
+    return out
+
+
+def legacy(page, request):
+    return json.dumps(jsonable_encoder([serialize_crop(c, request) for c in page])).encode()
+
+
+def fast(page, request):
+    return render_json(CropSerializer(request).many(page))
+
+
+def main(number: int = 200) -> None:
+    page = _page()
+    for fn in (legacy, fast):
+        request = _request()
+        secs = min(timeit.repeat(lambda: fn(page, request), number=number, repeat=5)) / number
+        print(f"{fn.__name__:>7}: {secs * 1e3:7.3f} ms/page  {secs / PAGE * 1e6:6.2f} us/item")
+
+
+if __name__ == "__main__":
+    main()
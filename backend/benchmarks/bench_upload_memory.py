@@ -0,0 +1,90 @@
+"""
+Peak memory of processing one ~10MB phone photo (4032x3024 JPEG).
+
+    cd backend && python -m benchmarks.bench_upload_memory
+
+Each path runs in a fresh interpreter and reports how far its peak RSS
+(VmHWM, reset after imports; Linux only) rose above the post-import RSS:
+
+- legacy: the whole upload read into bytes, decoded at full resolution,
+  one 1200px JPEG out (the pre-streaming /media/upload).
+- streaming: spooled file path, draft() decode at reduced scale, all
+  WebP/JPEG derivatives out (process_image_timed as used today).
+
+An image worker holds one image at a time, so N concurrent uploads cost
+about IMAGE_WORKERS x the streaming figure instead of N x the legacy one.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from io import BytesIO
+
+
+def _photo(path: str) -> None:
+    from PIL import Image
+
+    # noise compresses badly, like a detailed outdoor shot at phone quality
+    img = Image.frombytes("RGB", (4032, 3024), os.urandom(4032 * 3024 * 3))
+    img.save(path, format="JPEG", quality=85)
+
+
+def _legacy(path: str) -> None:
+    from PIL import Image, ImageOps
+
+    with open(path, "rb") as f:
+        blob = f.read()
+    img = Image.open(BytesIO(blob))
+    img.load()
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((1200, 1200), Image.LANCZOS)
+    buf = BytesIO()
+    img.save(buf, format="JPEG", quality=85, optimize=True)
+
+
+def _streaming(path: str) -> None:
+    from app.utils.images import process_image_timed
+
+    process_image_timed(path)
+
+
+def _status_kb(field: str) -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    raise RuntimeError(field)
+
+
+def child(mode: str, path: str) -> None:
+    import PIL.Image  # noqa: F401  (import cost is not part of the measurement)
+    import app.utils.images  # noqa: F401
+
+    # reset the high-water mark so import-time peaks don't hide ours
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    base = _status_kb("VmRSS")
+    {"legacy": _legacy, "streaming": _streaming}[mode](path)
+    print(json.dumps({"base_kb": base, "peak_kb": _status_kb("VmHWM")}))
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "photo.jpg")
+        _photo(path)
+        print(f"input: {os.path.getsize(path) / 2**20:.1f} MiB, 4032x3024")
+        for mode in ("legacy", "streaming"):
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_upload_memory", "--child", mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            r = json.loads(out)
+            print(f"{mode:>9}: peak +{(r['peak_kb'] - r['base_kb']) / 1024:6.1f} MiB over baseline")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main()
@@ -1,22 +1,27 @@
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 from app.db.base import Base
 from app import models  # noqa: F401
 from app.models import User, Role
 from app.models.media import Media
 from app.main import app
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.core.security import create_access_token
+from app.core.ratelimit import limiter
+from app.core.cache import response_cache
+from app.db.routing import clear_pins
+from app.core.suggest_index import crop_suggest_index
 
 @pytest.fixture
-def db():
+def db(tmp_path):
+    # a file, not :memory:, so the async engine (get_async_db) sees the same data
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{tmp_path / 'test.db'}",
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
     TestingSessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
     Media.__table__.indexes.clear()  # drop partial index for SQLite
@@ -36,6 +41,22 @@ def client(db):
         finally:
             pass
     app.dependency_overrides[get_db] = override_get_db
+
+    # NullPool: connections are opened on the TestClient's event loop and
+    # must not outlive it
+    async_engine = create_async_engine(
+        db.get_bind().url.set(drivername="sqlite+aiosqlite"), poolclass=NullPool,
+    )
+    AsyncTestingSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestingSession() as s:
+            yield s
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    limiter.reset()  # per-IP limits are process-global; start each test clean
+    response_cache.clear()
+    clear_pins()
+    crop_suggest_index.clear()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
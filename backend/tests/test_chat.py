@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.core.security import create_access_token
+from app.models import Conversation, ConversationParticipant, Message, User, Role
+
+
+def _user(db, name, phone, role=Role.buyer):
+    u = User(name=name, phone=phone, role=role)
+    db.add(u)
+    db.commit()
+    db.refresh(u)
+    return u, {"Authorization": f"Bearer {create_access_token(u.id, u.role.value)}"}
+
+
+def test_chat_list_conversations_and_messages(client: TestClient, db):
+    buyer, buyer_headers = _user(db, "Buyer", "+249920000001")
+    seller, _ = _user(db, "Seller", "+249920000002", Role.seller)
+    _, outsider_headers = _user(db, "Other", "+249920000003")
+
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    convs = []
+    for listing_id in (7, 8):
+        c = Conversation(listing_id=listing_id, u_lo=buyer.id, u_hi=seller.id)
+        db.add(c)
+        db.flush()
+        db.add_all([
+            ConversationParticipant(conversation_id=c.id, user_id=buyer.id, role="buyer"),
+            ConversationParticipant(conversation_id=c.id, user_id=seller.id, role="seller"),
+        ])
+        convs.append(c)
+    db.add_all([
+        Message(conversation_id=convs[0].id, sender_id=buyer.id, body=f"m{i}", created_at=base + timedelta(minutes=i))
+        for i in range(5)
+    ])
+    db.commit()
+
+    r = client.get("/chat/conversations", headers=buyer_headers)
+    assert r.status_code == 200, r.text
+    by_listing = {c["listing_id"]: c for c in r.json()}
+    assert by_listing[7]["last_message"]["body"] == "m4"
+    assert by_listing[8]["last_message"] is None
+    assert client.get("/chat/conversations", params={"scope": "selling"}, headers=buyer_headers).json() == []
+
+    msgs = client.get(f"/chat/conversations/{convs[0].id}/messages", params={"limit": 2}, headers=buyer_headers).json()
+    assert [m["body"] for m in msgs] == ["m3", "m4"]
+    older = client.get(
+        f"/chat/conversations/{convs[0].id}/messages", params={"before_id": msgs[0]["id"]}, headers=buyer_headers,
+    ).json()
+    assert [m["body"] for m in older] == ["m0", "m1", "m2"]
+
+    assert client.get(f"/chat/conversations/{convs[0].id}/messages", headers=outsider_headers).status_code == 403
+    assert client.get("/chat/conversations/999/messages", headers=buyer_headers).status_code == 404
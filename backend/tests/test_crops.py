@@ -1,4 +1,5 @@
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 
 def _sample_crop(state="State1"):
     return {
@@ -66,3 +67,459 @@ def test_crop_create_requires_role(
 
     allowed = client.post("/crops", json=_sample_crop(), headers=admin_headers)
     assert allowed.status_code == 201
+
+
+def _seed_crops(db, n=5, **overrides):
+    from datetime import datetime, timedelta
+    from app.models import Crop, User, Role
+
+    seller = User(name="Seller", phone=f"+24990{db.query(User).count():07d}", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    db.refresh(seller)
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    rows = []
+    for i in range(n):
+        fields = dict(
+            name=f"Crop {i}", type="veg", qty=10, price=float(10 + (i % 3)),
+            unit="kg", lat=15.0, lng=32.0, state="Khartoum",
+            created_at=base + timedelta(minutes=i // 2),
+        )
+        fields.update(overrides)
+        rows.append(Crop(seller_id=seller.id, **fields))
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def test_crop_list_cursor_pagination(client: TestClient, db):
+    _seed_crops(db, 7)
+    for sort in ("newest", "price_asc", "price_desc"):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 3, "sort": sort}
+            if cursor:
+                params["cursor"] = cursor
+            r = client.get("/crops", params=params)
+            assert r.status_code == 200
+            body = r.json()
+            seen += [c["id"] for c in body["items"]]
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+        offset_ids = [c["id"] for c in client.get("/crops", params={"limit": 100, "sort": sort}).json()["items"]]
+        assert seen == offset_ids
+        assert len(set(seen)) == 7
+
+
+def test_crop_created_at_orders_rows_inserted_together(client: TestClient, db):
+    from app.models import Crop, User, Role
+
+    seller = User(name="Seller", phone="+249950000001", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    crops = [
+        Crop(name=f"Crop {i}", type="veg", qty=1, price=1, unit="kg", seller_id=seller.id, lat=15.0, lng=32.0)
+        for i in range(4)
+    ]
+    db.add_all(crops)
+    db.commit()  # well within one second
+    assert len({c.created_at for c in crops}) == 4
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/crops", params=params).json()
+        seen += [c["id"] for c in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == [c.id for c in reversed(crops)]
+
+
+def test_crop_list_cursor_rejects_bad_tokens(client: TestClient, db):
+    _seed_crops(db, 3)
+    assert client.get("/crops", params={"cursor": "not-a-cursor"}).status_code == 400
+    first = client.get("/crops", params={"limit": 1}).json()
+    mismatched = client.get("/crops", params={"cursor": first["next_cursor"], "sort": "price_asc"})
+    assert mismatched.status_code == 400
+
+
+def test_crop_list_total_modes(client: TestClient, db, monkeypatch):
+    from app.core.cache import response_cache
+    from app.repositories import crops as crops_repo
+
+    _seed_crops(db, 5)
+    assert client.get("/crops", params={"total": "exact"}).json()["total"] == 5
+    assert client.get("/crops", params={"total": "none"}).json()["total"] is None
+    assert client.get("/crops", params={"total": "estimate"}).json()["total"] == 5
+
+    monkeypatch.setattr(crops_repo, "ESTIMATE_CAP", 3)
+    response_cache.clear()
+    assert client.get("/crops", params={"total": "estimate"}).json()["total"] == "3+"
+
+
+def test_planner_explain_expands_in_lists(db):
+    from sqlalchemy.dialects import postgresql
+    from app.models import Crop
+    from app.repositories.crops import _explain_sql
+
+    # search-index candidates become Crop.id IN (...); the driver-level
+    # EXPLAIN must get plain binds, not a post-compile placeholder
+    query = db.query(Crop).filter(Crop.id.in_([4, 8, 15]), Crop.name == "x")
+    sql, params = _explain_sql(query, postgresql.dialect())
+    assert "POSTCOMPILE" not in sql
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT")
+    assert sorted(v for v in params.values() if isinstance(v, int)) == [4, 8, 15]
+
+
+def test_crop_search_uses_normalized_column(client: TestClient, db):
+    rows = _seed_crops(db, 1, name="ذُرَة شاميّة", type="حبوب")
+    _seed_crops(db, 1, name="سمسم", type="حبوب")
+    assert rows[0].search_text.startswith("ذره")
+
+    found = client.get("/crops", params={"q": "ذرة"}).json()["items"]
+    assert [c["id"] for c in found] == [rows[0].id]
+
+    ranked = client.get("/crops", params={"q": "حبوب", "sort": "relevance"}).json()
+    assert len(ranked["items"]) == 2
+    assert ranked["next_cursor"] is None
+
+
+def test_crop_geo_filters_and_distance_sort(client: TestClient, db):
+    khartoum = _seed_crops(db, 1, name="Khartoum", lat=15.60, lng=32.53)[0]
+    omdurman = _seed_crops(db, 1, name="Omdurman", lat=15.65, lng=32.48)[0]
+    madani = _seed_crops(db, 1, name="Madani", lat=14.40, lng=33.52)[0]
+
+    near = client.get("/crops", params={"near": "15.6,32.53", "radius_km": 20}).json()
+    assert {c["id"] for c in near["items"]} == {khartoum.id, omdurman.id}
+
+    boxed = client.get("/crops", params={"bbox": "33,14,34,15"}).json()
+    assert [c["id"] for c in boxed["items"]] == [madani.id]
+
+    by_dist = client.get("/crops", params={"near": "14.4,33.5", "sort": "distance"}).json()
+    assert [c["id"] for c in by_dist["items"]] == [madani.id, khartoum.id, omdurman.id]
+    assert by_dist["items"][0]["distance_km"] < 5
+
+    assert client.get("/crops", params={"sort": "distance"}).status_code == 400
+    assert client.get("/crops", params={"radius_km": 5}).status_code == 400
+    assert client.get("/crops", params={"bbox": "34,14,33,15"}).status_code == 400
+
+
+def test_crop_clusters(client: TestClient, db):
+    a, b = _seed_crops(db, 2, lat=15.60, lng=32.53)
+    far = _seed_crops(db, 1, lat=14.40, lng=33.52, price=7.0)[0]
+
+    r = client.get("/crops/clusters", params={"bbox": "30,12,35,17", "zoom": 6})
+    assert r.status_code == 200
+    clusters = sorted(r.json()["clusters"], key=lambda c: -c["count"])
+    assert [c["count"] for c in clusters] == [2, 1]
+    assert clusters[0]["crop_id"] is None
+    assert clusters[1]["crop_id"] == far.id and clusters[1]["min_price"] == 7.0
+
+    filtered = client.get("/crops/clusters", params={"bbox": "30,12,35,17", "zoom": 6, "max_price": 8})
+    assert [c["count"] for c in filtered.json()["clusters"]] == [1]
+
+    assert client.get("/crops/clusters", params={"zoom": 6}).status_code == 400
+
+
+def test_crop_facets(client: TestClient, db):
+    _seed_crops(db, 3, state="Khartoum", type="grain", price=50.0)
+    _seed_crops(db, 1, state="Sennar", type="veg", price=700.0)
+
+    r = client.get("/crops/facets")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["total"] == 4
+    assert body["state"][0] == {"value": "Khartoum", "count": 3}
+    assert {t["value"]: t["count"] for t in body["type"]} == {"grain": 3, "veg": 1}
+    assert [b["count"] for b in body["price"]] == [3, 0, 1, 0, 0]
+
+    narrowed = client.get("/crops/facets", params={"type": "veg", "price_edges": "600"}).json()
+    assert narrowed["total"] == 1
+    assert narrowed["price"] == [{"min": None, "max": 600.0, "count": 0}, {"min": 600.0, "max": None, "count": 1}]
+
+    # a committed crop write bumps the table version, so counts are fresh
+    _seed_crops(db, 1, state="Khartoum", type="grain", price=50.0)
+    assert client.get("/crops/facets").json()["total"] == 5
+
+
+def test_crop_responses_are_cached_until_a_write(client: TestClient, db):
+    crop = _seed_crops(db, 1)[0]
+    first = client.get("/crops").json()
+    assert client.get(f"/crops/{crop.id}").json()["name"] == "Crop 0"
+
+    # a write outside the ORM session is not seen: served from cache
+    db.execute(text("UPDATE crops SET name = 'Renamed' WHERE id = :id"), {"id": crop.id})
+    db.commit()
+    assert client.get("/crops").json() == first
+    assert client.get(f"/crops/{crop.id}").json()["name"] == "Crop 0"
+
+    # an ORM write bumps the crops version and invalidates both entries
+    db.refresh(crop)
+    crop.qty = 99
+    db.commit()
+    assert client.get("/crops").json()["items"][0]["name"] == "Renamed"
+    assert client.get(f"/crops/{crop.id}").json()["qty"] == 99
+
+
+def test_crop_etags_and_304(client: TestClient, db):
+    crop = _seed_crops(db, 2)[0]
+
+    detail = client.get(f"/crops/{crop.id}")
+    etag = detail.headers["etag"]
+    assert not etag.startswith("W/")
+    again = client.get(f"/crops/{crop.id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+
+    page = client.get("/crops")
+    weak = page.headers["etag"]
+    assert weak.startswith("W/")
+    assert client.get("/crops", headers={"If-None-Match": weak}).status_code == 304
+
+    crop.price = 999
+    db.commit()
+    changed = client.get(f"/crops/{crop.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert client.get("/crops", headers={"If-None-Match": weak}).status_code == 200
+
+
+def test_crop_sparse_fieldsets(client: TestClient, db):
+    from app.models.media import Media
+
+    crop = _seed_crops(db, 1, notes="long notes")[0]
+    db.add_all([
+        Media(crop_id=crop.id, path="uploads/a.jpg", is_main=True),
+        Media(crop_id=crop.id, path="uploads/b.jpg", is_main=False),
+    ])
+    db.commit()
+
+    card = client.get("/crops", params={"fields": "id,name,price,image_url"}).json()["items"][0]
+    assert set(card) == {"id", "name", "price", "image_url"}
+    assert card["image_url"].endswith("/static/uploads/a.jpg")
+
+    detail = client.get(f"/crops/{crop.id}", params={"fields": "notes,images,seller_name"}).json()
+    assert detail == {
+        "seller_name": "Seller",
+        "notes": "long notes",
+        "images": [detail["images"][0], detail["images"][1]],
+    }
+    assert len(detail["images"]) == 2
+
+    near = client.get("/crops", params={"fields": "id,distance_km", "near": "15,32"}).json()["items"][0]
+    assert set(near) == {"id", "distance_km"}
+
+    assert client.get("/crops", params={"fields": "id,password"}).status_code == 400
+
+
+def test_crop_list_cards_and_detail_images(client: TestClient, db):
+    from app.models.media import Media
+
+    crop = _seed_crops(db, 1, notes="long notes")[0]
+    bare = _seed_crops(db, 1)[0]
+    db.add_all([
+        Media(crop_id=crop.id, path="uploads/a.jpg", is_main=False),
+        Media(crop_id=crop.id, path="uploads/b.jpg", is_main=True),
+    ])
+    db.commit()
+
+    items = {i["id"]: i for i in client.get("/crops").json()["items"]}
+    assert set(items[crop.id]) == {
+        "id", "name", "type", "qty", "price", "unit", "seller_id", "location",
+        "image_url", "thumb_url", "srcset", "created_at",
+    }
+    assert items[crop.id]["image_url"].endswith("/static/uploads/b.jpg")
+    assert items[bare.id]["image_url"] is None
+
+    detail = client.get(f"/crops/{crop.id}").json()
+    assert detail["image_url"].endswith("/static/uploads/b.jpg")
+    assert len(detail["images"]) == 2
+    assert detail["seller_name"] == "Seller" and detail["notes"] == "long notes"
+
+
+def test_crop_batch_lookup(client: TestClient, db):
+    a, b, c = _seed_crops(db, 3)
+
+    r = client.get("/crops/batch", params={"ids": f"{c.id},999999,{a.id},{c.id}"})
+    assert r.status_code == 200
+    body = r.json()
+    assert [i["id"] for i in body["items"]] == [c.id, a.id]
+    assert body["missing"] == [999999]
+    assert "images" not in body["items"][0]
+
+    r = client.post("/crops/batch", json={"ids": [b.id, a.id], "fields": "id,name"})
+    assert r.status_code == 200
+    assert r.json() == {"items": [{"id": b.id, "name": b.name}, {"id": a.id, "name": a.name}], "missing": []}
+
+    assert client.get("/crops/batch", params={"ids": "1,x"}).status_code == 400
+    assert client.get("/crops/batch", params={"ids": ",".join(map(str, range(1, 102)))}).status_code == 400
+    assert client.post("/crops/batch", json={"ids": []}).status_code == 422
+
+
+def test_crop_suggest(client: TestClient, db):
+    _seed_crops(db, 3, name="طماطم حمراء", type="خضار")
+    _seed_crops(db, 1, name="طماطم", type="خضار")
+    _seed_crops(db, 2, name="Tomato", type="Vegetable")
+
+    items = client.get("/crops/suggest", params={"prefix": "طما"}).json()["items"]
+    assert items == [
+        {"text": "طماطم حمراء", "kind": "name", "count": 3},
+        {"text": "طماطم", "kind": "name", "count": 1},
+    ]
+    # word starts match too, and Arabic letter forms are unified
+    assert [i["text"] for i in client.get("/crops/suggest", params={"prefix": "حمرا"}).json()["items"]] == ["طماطم حمراء"]
+    assert client.get("/crops/suggest", params={"prefix": "خضار"}).json()["items"] == [
+        {"text": "خضار", "kind": "type", "count": 4},
+    ]
+    assert [i["kind"] for i in client.get("/crops/suggest", params={"prefix": "TOM"}).json()["items"]] == ["name"]
+    assert client.get("/crops/suggest", params={"prefix": "x", "limit": 0}).status_code == 422
+
+
+def test_crop_price_stats_rollup(client: TestClient, db, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+    from app.models import CropPriceDaily
+    from app.repositories.stats import refresh_price_rollup
+    from app.routes import crops as crops_routes
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    for i, price in enumerate((100, 200, 200, 300, 1000)):
+        _seed_crops(db, 1, type="veg", price=float(price), created_at=now - timedelta(days=i % 2))
+    _seed_crops(db, 1, type="fruit", price=50.0, created_at=now)
+    old = _seed_crops(db, 1, type="veg", price=9.0, created_at=now - timedelta(days=90))[0]
+
+    # no rollup yet (the migration seeds it): answer empty, refresh off-request
+    scheduled = []
+    monkeypatch.setattr(crops_routes, "refresh_price_rollup_detached", lambda: scheduled.append(1))
+    cold = client.get("/crops/stats", params={"type": "veg"}).json()
+    assert (cold["count"], cold["as_of"], scheduled) == (0, None, [1])
+    refresh_price_rollup(db)
+
+    body = client.get("/crops/stats", params={"type": "veg", "state": "khartoum"}).json()
+    assert body["state"] == "Khartoum" and body["as_of"]
+    assert (body["count"], body["min"], body["max"], body["median"], body["p10"], body["p90"]) == (
+        5, 100.0, 1000.0, 200.0, 100.0, 1000.0,
+    )
+    assert [t["count"] for t in body["trend"]] == [2, 3]
+    assert client.get("/crops/stats", params={"type": "veg", "days": 120}).json()["min"] == 9.0
+
+    # the endpoint reads the rollup only; changes show up after a refresh
+    _seed_crops(db, 1, type="veg", price=5000.0, created_at=now)
+    assert client.get("/crops/stats", params={"type": "veg"}).json()["count"] == 5
+    assert refresh_price_rollup(db)["full"] is False
+    assert client.get("/crops/stats", params={"type": "veg"}).json()["max"] == 5000.0
+
+    # deletes are only picked up by a full rebuild
+    db.delete(old)
+    db.commit()
+    refresh_price_rollup(db, full=True)
+    assert db.query(CropPriceDaily).filter(CropPriceDaily.price == 9.0).count() == 0
+    assert client.get("/crops/stats", params={"type": "none"}).json()["count"] == 0
+
+
+def test_price_rollup_incremental_filter_uses_created_at_ranges():
+    from datetime import date
+    from sqlalchemy.dialects import postgresql
+    from app.repositories.stats import _created_in
+
+    sql = str(_created_in([date(2025, 1, 3), date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 7)]).compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True},
+    ))
+    assert "date(" not in sql
+    # consecutive days collapse into one half-open range
+    assert sql.count("crops.created_at >=") == 2
+    assert "'2025-01-04 00:00:00+00:00'" in sql and "'2025-01-08 00:00:00+00:00'" in sql
+
+
+def test_price_rollup_days_are_utc_on_postgres():
+    from sqlalchemy.dialects import postgresql
+    from app.repositories.stats import _rollup_select
+
+    # date(timestamptz) would follow the session TimeZone, not the UTC
+    # ranges the incremental refresh deletes and reselects
+    sql = str(_rollup_select("postgresql").compile(dialect=postgresql.dialect()))
+    assert sql.count("date(timezone('UTC', crops.created_at))") == 2  # select and group by
+
+
+def test_crop_bulk_import(client: TestClient, db, buyer_headers):
+    from app.core.security import create_access_token
+    from app.models import Crop, User, Role
+
+    seller = User(name="Coop", phone="+249911111111", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    db.refresh(seller)
+    headers = {"Authorization": f"Bearer {create_access_token(seller.id, seller.role.value)}"}
+    assert client.get("/crops", params={"q": "طماطم"}).json()["total"] == 0
+
+    csv_body = (
+        "name,type,qty,price,unit,lat,lng,state,locality,address,notes\n"
+        "طماطم,خضار,100,500,kg,15.6,32.5,khartoum,,,\n"
+        "x,خضار,1,1,kg,15.6,32.5,,,,\n"
+        "بصل,خضار,50,-3,kg,15.6,32.5,,,,\n"
+        '"قمح ""بلدي""",حبوب,10,900,طن,14.4,33.5,,,,"line1\nline2"\n'
+    )
+    r = client.post("/crops/import", content=csv_body.encode(), headers={**headers, "Content-Type": "text/csv"})
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert (report["total"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [e["row"] for e in report["errors"]] == [2, 3]
+    assert report["errors"][1]["errors"][0].startswith("price")
+
+    rows = db.query(Crop).filter(Crop.seller_id == seller.id).order_by(Crop.id).all()
+    assert [c.name for c in rows] == ["طماطم", 'قمح "بلدي"']
+    assert rows[0].state == "Khartoum" and rows[0].search_text == "طماطم خضار khartoum"
+    assert rows[1].notes == "line1\nline2"
+    # bulk inserts invalidate cached listings too
+    assert client.get("/crops", params={"q": "طماطم"}).json()["total"] == 1
+
+    ndjson = (
+        '{"name": "ذرة", "type": "حبوب", "qty": 5, "price": 70, "unit": "kg", "location": {"lat": 1, "lng": 2}}\n'
+        '\nnot json\n[1]\n'
+        '{"name": "ذرة", "qty": 5, "price": 70, "unit": "kg", "location": {"lat": 1, "lng": 2}}\n'
+    )
+    r = client.post("/crops/import", params={"format": "ndjson", "dry_run": True}, content=ndjson, headers=headers)
+    assert r.json()["valid"] == 1 and r.json()["imported"] == 0
+    assert [e["errors"] for e in r.json()["errors"]] == [
+        ["invalid JSON"], ["expected a JSON object"], ["type: Field required"],
+    ]
+    assert db.query(Crop).filter(Crop.name == "ذرة").count() == 0
+
+    assert client.post("/crops/import", content=b"", headers=headers).status_code == 415
+    assert client.post("/crops/import", params={"seller_id": 1, "format": "csv"}, content=b"", headers=headers).status_code == 403
+    assert client.post("/crops/import", content=csv_body, headers={**buyer_headers, "Content-Type": "text/csv"}).status_code == 403
+
+
+def test_crop_bulk_import_checks_seller_cap_and_indexes(client: TestClient, db, admin_headers, buyer_headers, monkeypatch):
+    from app.core.search_index import crop_search_index
+    from app.core.suggest_index import crop_suggest_index
+    from app.models import Crop, Role, User
+    from app.routes import crops as crops_routes
+
+    seller = User(name="Coop", phone="+249911111112", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    buyer_id = db.query(User).filter(User.role == Role.buyer).one().id
+    csv_body = "name,type,qty,price,unit,lat,lng,state,locality,address,notes\nسمسم,حبوب,1,9,kg,1,2,,,,\n"
+    headers = {**admin_headers, "Content-Type": "text/csv"}
+
+    assert client.post("/crops/import", params={"seller_id": 9999}, content=csv_body, headers=headers).status_code == 404
+    assert client.post("/crops/import", params={"seller_id": buyer_id}, content=csv_body, headers=headers).status_code == 400
+
+    # chunked: no Content-Length for the middleware to check
+    monkeypatch.setattr(crops_routes, "MAX_IMPORT_BYTES", 64)
+    chunked = iter([csv_body.encode()] * 3)
+    r = client.post("/crops/import", params={"seller_id": seller.id}, content=chunked, headers=headers)
+    assert r.status_code == 413
+    assert db.query(Crop).count() == 0
+    monkeypatch.setattr(crops_routes, "MAX_IMPORT_BYTES", 10 * 1024 * 1024)
+
+    crop_search_index.rebuild(db)
+    crop_suggest_index.rebuild(db)
+    try:
+        r = client.post("/crops/import", params={"seller_id": seller.id}, content=csv_body, headers=headers)
+        assert r.json()["imported"] == 1
+        assert db.query(Crop).one().seller_id == seller.id
+        assert crop_search_index.stale and crop_suggest_index.stale
+    finally:
+        crop_search_index.clear()
+        crop_suggest_index.clear()
@@ -0,0 +1,56 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.base import Base
+from app.models import User, Role
+
+
+def test_reads_go_to_replica_until_the_client_writes(client: TestClient, db, tmp_path, monkeypatch):
+    # an empty "replica" that never catches up makes the routing visible
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    Base.metadata.create_all(create_engine(replica_url))
+    monkeypatch.setattr(settings, "database_replica_urls", [replica_url])
+
+    seller = User(name="Seller", phone="+249930000001", role=Role.seller)
+    buyer = User(name="Buyer", phone="+249930000002", role=Role.buyer)
+    db.add_all([seller, buyer])
+    db.commit()
+    seller_headers = {"Authorization": f"Bearer {create_access_token(seller.id, seller.role.value)}"}
+    other_headers = {"Authorization": f"Bearer {create_access_token(buyer.id, buyer.role.value)}"}
+
+    ndjson = '{"name": "ذرة", "type": "حبوب", "qty": 5, "price": 70, "unit": "kg", "location": {"lat": 1, "lng": 2}}\n'
+    assert client.get("/crops", headers=seller_headers).json()["total"] == 0
+
+    r = client.post("/crops/import", params={"format": "ndjson"}, content=ndjson, headers=seller_headers)
+    assert r.json()["imported"] == 1
+
+    # the writer reads the primary (async and sync sessions), everyone else
+    # the replica - on pages the writer's reads haven't put in the response cache
+    assert client.get("/crops", headers=seller_headers).json()["total"] == 1
+    assert client.get("/crops/facets", headers=seller_headers).json()["total"] == 1
+    assert client.get("/crops", params={"limit": 10}, headers=other_headers).json()["total"] == 0
+    assert client.get("/crops/facets", params={"state": "x"}, headers=other_headers).json()["total"] == 0
+
+    # requests that commit nothing don't pin
+    r = client.post("/crops/import", params={"format": "ndjson", "dry_run": True}, content=ndjson, headers=other_headers)
+    assert r.status_code == 403
+    assert client.get("/crops", params={"limit": 11}, headers=other_headers).json()["total"] == 0
+
+
+def test_primary_pins_survive_response_cache_pressure(monkeypatch):
+    from starlette.requests import Request
+
+    from app.core.cache import response_cache
+    from app.db.routing import pin_to_primary, pinned_to_primary
+
+    def request(host):
+        return Request({"type": "http", "headers": [], "client": (host, 1234)})
+
+    pin_to_primary("ip:10.0.0.1")
+    monkeypatch.setattr(response_cache, "enabled", True)
+    for i in range(settings.response_cache_size + 10):
+        response_cache.set(f"crops:{i}", {"items": []})
+    assert pinned_to_primary(request("10.0.0.1"))
+    assert not pinned_to_primary(request("10.0.0.2"))
@@ -0,0 +1,116 @@
+import io
+
+import anyio
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from app.core.config import settings
+from app.models import Crop, Role, User
+from app.services import image_pipeline, media_service
+
+
+def _jpeg(size=(2400, 1600)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color=(0, 128, 0)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _stage_count(stage):
+    return REGISTRY.get_sample_value("image_pipeline_stage_seconds_count", {"stage": stage}) or 0
+
+
+def test_process_image_in_process_pool_records_stages(monkeypatch):
+    monkeypatch.setattr(settings, "image_workers", 1)
+    before = {s: _stage_count(s) for s in ("queue", "decode", "resize", "encode")}
+    try:
+        derivatives = anyio.run(image_pipeline.process_image, _jpeg())
+    finally:
+        image_pipeline.shutdown()
+    assert [(d.width, d.height) for d in derivatives] == [(160, 107), (480, 320), (1200, 800)]
+    assert Image.open(io.BytesIO(derivatives[-1].jpeg)).format == "JPEG"
+    assert Image.open(io.BytesIO(derivatives[0].webp)).format == "WEBP"
+    assert len(derivatives[0].webp) < len(derivatives[-1].jpeg) / 10
+    assert all(_stage_count(s) == before[s] + 1 for s in before)
+
+
+def test_upload_rejected_with_429_when_queue_full(client, db, monkeypatch):
+    seller = User(name="Seller", phone="+249940000001", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    crop = Crop(name="Tomato", type="veg", qty=1, price=1, unit="kg", seller_id=seller.id, lat=0, lng=0)
+    db.add(crop)
+    db.commit()
+
+    monkeypatch.setattr(settings, "image_queue_max", 0)
+    r = client.post(
+        "/media/upload",
+        data={"crop_id": crop.id},
+        files={"file": ("a.jpg", _jpeg((10, 10)), "image/jpeg")},
+    )
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "5"
+
+    monkeypatch.setattr(settings, "image_queue_max", 8)
+    monkeypatch.setattr(settings, "image_workers", 0)
+    monkeypatch.setattr(media_service, "store_derivatives", lambda derivatives, stem=None: ("k.jpg", []))
+    r = client.post(
+        "/media/upload",
+        data={"crop_id": crop.id},
+        files={"file": ("a.txt", b"not an image", "image/jpeg")},
+    )
+    assert r.status_code == 400
+
+
+def test_admission_limit_is_per_worker(monkeypatch):
+    monkeypatch.setattr(settings, "image_queue_max", 8)
+    monkeypatch.setattr(settings, "image_workers", 3)
+    assert image_pipeline.admission_limit() == 24
+    monkeypatch.setattr(settings, "image_workers", 0)  # threads: one queue
+    assert image_pipeline.admission_limit() == 8
+
+
+def test_small_source_collapses_derivatives():
+    from app.utils.images import process_image_timed
+
+    derivatives, timings = process_image_timed(_jpeg((300, 200)))
+    assert [(d.width, d.height) for d in derivatives] == [(160, 107), (300, 200)]
+    assert set(timings) == {"decode", "transpose", "resize", "encode"}
+
+
+def test_spool_upload_enforces_cap_while_reading(tmp_path):
+    import pytest
+    from app.utils.uploads import UploadTooLarge, spool_upload
+
+    path = spool_upload(io.BytesIO(b"x" * 100), max_bytes=100, dir=str(tmp_path))
+    assert open(path, "rb").read() == b"x" * 100
+    with pytest.raises(UploadTooLarge):
+        spool_upload(io.BytesIO(b"x" * 101), max_bytes=100, dir=str(tmp_path))
+    assert [p.name for p in tmp_path.iterdir()] == [path.rsplit("/", 1)[-1]]  # partial file removed
+
+
+def test_large_jpeg_decodes_in_draft_mode(tmp_path):
+    from app.utils.images import process_image_timed
+
+    path = tmp_path / "big.jpg"
+    path.write_bytes(_jpeg((4000, 3000)))
+    derivatives, _ = process_image_timed(str(path))
+    assert (derivatives[-1].width, derivatives[-1].height) == (1200, 900)
+
+
+def test_media_upload_over_cap_is_413(client, db, monkeypatch):
+    from app.routes import media as media_routes
+
+    seller = User(name="Seller", phone="+249940000002", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    crop = Crop(name="Okra", type="veg", qty=1, price=1, unit="kg", seller_id=seller.id, lat=0, lng=0)
+    db.add(crop)
+    db.commit()
+
+    monkeypatch.setattr(media_routes, "MAX_BYTES", 100)
+    r = client.post(
+        "/media/upload",
+        data={"crop_id": crop.id},
+        files={"file": ("a.jpg", _jpeg((50, 50)), "image/jpeg")},
+    )
+    assert r.status_code == 413
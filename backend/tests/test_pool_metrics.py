@@ -0,0 +1,104 @@
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.pool_metrics import InstrumentedQueuePool, track_engine
+
+
+def _sample(name, pool):
+    return REGISTRY.get_sample_value(name, {"pool": pool})
+
+
+def test_pool_gauges_and_checkout_histogram(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1, pool_logging_name="test-pool",
+    )
+    track_engine("test-pool", engine)
+    before = _sample("db_pool_checkout_seconds_count", "test-pool") or 0
+
+    conns = [engine.connect() for _ in range(3)]
+    conns[0].execute(text("select 1"))
+    assert _sample("db_pool_checked_out", "test-pool") == 3
+    assert _sample("db_pool_overflow", "test-pool") == 1
+    assert _sample("db_pool_size", "test-pool") == 2
+    assert _sample("db_pool_waiting", "test-pool") == 0
+    assert _sample("db_pool_checkout_seconds_count", "test-pool") == before + 3
+
+    for c in conns:
+        c.close()
+    assert _sample("db_pool_checked_out", "test-pool") == 0
+    engine.dispose()
+
+
+def test_pool_gauges_follow_a_disposed_engine(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=1, pool_logging_name="test-dispose",
+    )
+    track_engine("test-dispose", engine)
+    conns = [engine.connect() for _ in range(2)]
+    assert _sample("db_pool_checked_out", "test-dispose") == 2
+
+    # dispose() swaps in a fresh pool; the old one still counts its checkouts
+    engine.dispose()
+    engine.connect().close()
+    assert _sample("db_pool_checked_out", "test-dispose") == 0
+    for c in conns:
+        c.close()
+    engine.dispose()
+
+
+def test_waiting_counts_only_callers_blocked_on_exhausted_pool(tmp_path):
+    import threading
+    import time
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_logging_name="tiny-pool",
+    )
+    held = engine.connect()
+    assert (_sample("db_pool_waiting", "tiny-pool") or 0) == 0
+
+    got = threading.Event()
+
+    def blocked():
+        with engine.connect():
+            got.set()
+
+    t = threading.Thread(target=blocked)
+    t.start()
+    deadline = time.monotonic() + 5
+    while _sample("db_pool_waiting", "tiny-pool") != 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _sample("db_pool_waiting", "tiny-pool") == 1
+    assert not got.is_set()
+
+    held.close()
+    t.join(5)
+    assert got.is_set()
+    assert _sample("db_pool_waiting", "tiny-pool") == 0
+    engine.dispose()
+
+
+def test_engine_options_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "db_pool_size", 7)
+    monkeypatch.setattr(settings, "db_statement_timeout_ms", 5000)
+    opts = db_session._engine_options("postgresql+psycopg://u:p@h/db", "primary")
+    assert opts["pool_size"] == 7
+    assert opts["poolclass"] is InstrumentedQueuePool
+    assert opts["connect_args"] == {"options": "-c statement_timeout=5000"}
+    # SQLite keeps its default pool and ignores the sizing knobs
+    assert "pool_size" not in db_session._engine_options("sqlite:///x.db", "primary")
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    # closed unless a scraper token is configured and sent
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "metrics_token", "scrape-me")
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 403
+    r = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert r.status_code == 200
+    assert "db_pool_checkout_seconds" in r.text
+    assert "http_request" in r.text
@@ -0,0 +1,70 @@
+import pytest
+
+from app.core import s3, storage
+from app.core.config import settings
+from app.services import media_service
+from app.utils.images import Derivative
+
+moto = pytest.importorskip("moto")
+
+BUCKET = "mahaseel-test"
+
+
+@pytest.fixture
+def bucket(monkeypatch):
+    # moto is the local S3 stand-in; the same code runs against MinIO via S3_ENDPOINT_URL
+    for k, v in {"AWS_ACCESS_KEY_ID": "test", "AWS_SECRET_ACCESS_KEY": "test", "AWS_DEFAULT_REGION": "us-east-1"}.items():
+        monkeypatch.setenv(k, v)
+    monkeypatch.setattr(settings, "s3_bucket", BUCKET)
+    monkeypatch.setattr(settings, "s3_region", "us-east-1")
+    monkeypatch.setattr(settings, "s3_endpoint_url", "")
+    monkeypatch.setattr(settings, "s3_multipart_threshold_mb", 5)
+    monkeypatch.setattr(settings, "s3_multipart_chunk_mb", 5)
+    with moto.mock_aws():
+        s3.reset_s3_client()
+        s3.get_s3_client().create_bucket(Bucket=BUCKET)
+        yield s3.get_s3_client()
+    s3.reset_s3_client()
+
+
+def _keys(client):
+    return sorted(o["Key"] for o in client.list_objects_v2(Bucket=BUCKET).get("Contents", []))
+
+
+def test_client_is_shared_and_pooled(bucket):
+    assert s3.get_s3_client() is bucket
+    assert bucket.meta.config.max_pool_connections == settings.s3_max_pool_connections
+
+
+def test_large_objects_use_multipart(bucket):
+    s3.put_object("small.bin", b"x" * 1024, "application/octet-stream")
+    s3.put_object("large.bin", b"y" * (11 * s3.MB), "application/octet-stream")
+    assert "-" not in bucket.head_object(Bucket=BUCKET, Key="small.bin")["ETag"]
+    large = bucket.head_object(Bucket=BUCKET, Key="large.bin")
+    assert large["ETag"].strip('"').endswith("-3")  # 5 + 5 + 1 MiB parts
+    assert large["ContentLength"] == 11 * s3.MB
+
+
+def test_store_derivatives_and_batch_delete(bucket, monkeypatch):
+    monkeypatch.setattr(storage, "media_storage", storage.S3StorageBackend(BUCKET, "https://cdn.example"))
+    derivatives = [Derivative(160, 120, b"w1", b"j1"), Derivative(1200, 900, b"w2", b"j2")]
+    key, variants = media_service.store_derivatives(derivatives)
+    stem = key[:-len(".jpg")]
+    assert _keys(bucket) == sorted([key, f"{stem}_1200.webp", f"{stem}_160.jpg", f"{stem}_160.webp"])
+    assert bucket.get_object(Bucket=BUCKET, Key=f"{stem}_160.webp")["ContentType"] == "image/webp"
+    assert media_service.get_media_url(key) == f"https://cdn.example/{key}"
+
+    media = media_service.Media(path=key, variants=variants)
+    assert s3.delete_objects(media_service.media_keys(media)) == []
+    assert _keys(bucket) == []
+
+
+def test_delete_objects_batches_over_the_limit(bucket, monkeypatch):
+    monkeypatch.setattr(s3, "DELETE_BATCH", 2)
+    s3.put_many((f"k{i}", b"x", "text/plain") for i in range(5))
+    calls = []
+    real = bucket.delete_objects
+    monkeypatch.setattr(bucket, "delete_objects", lambda **kw: calls.append(kw) or real(**kw))
+    assert s3.delete_objects([f"k{i}" for i in range(5)]) == []
+    assert [len(c["Delete"]["Objects"]) for c in calls] == [2, 2, 1]
+    assert _keys(bucket) == []
@@ -0,0 +1,111 @@
+from app.core.config import settings
+from app.core.search_index import CropSearchIndex, crop_search_index
+from app.models import Crop, User, Role
+
+
+def _crop(db, seller, name, type_="حبوب"):
+    c = Crop(name=name, type=type_, qty=1, price=10, unit="kg", seller_id=seller.id, state="Sennar")
+    db.add(c)
+    db.commit()
+    db.refresh(c)
+    return c
+
+
+def test_index_candidates_and_incremental_add(db):
+    seller = User(name="S", phone="+249911111111", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    db.refresh(seller)
+    sesame = _crop(db, seller, "سمسم أبيض")
+    _crop(db, seller, "ذرة شامية")
+
+    idx = CropSearchIndex()
+    assert idx.candidates("سمسم") is None  # cold index -> SQL fallback
+    assert idx.rebuild(db) == 2
+    assert idx.candidates("سمسم") == {sesame.id}
+    assert idx.candidates("ابيض") == {sesame.id}
+    assert idx.candidates("قمح") == set()
+    assert idx.candidates("ذر") is None  # shorter than a trigram
+
+    wheat = _crop(db, seller, "قمح")
+    idx.add(wheat.id, wheat.search_text)
+    assert idx.candidates("قمح") == {wheat.id}
+    idx.remove(wheat.id)
+    assert idx.candidates("قمح") == set()
+
+
+def test_list_crops_uses_index_when_enabled(client, db, monkeypatch):
+    from sqlalchemy.orm import sessionmaker
+    from app.db import session as db_session
+
+    seller = User(name="S", phone="+249922222222", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    db.refresh(seller)
+    sesame = _crop(db, seller, "سمسم")
+    _crop(db, seller, "ذرة")
+
+    monkeypatch.setattr(settings, "search_index_enabled", True)
+    monkeypatch.setattr(db_session, "get_session_factory", lambda: sessionmaker(bind=db.get_bind()))
+    crop_search_index.clear()
+    started = []
+    real_refresh = crop_search_index.refresh
+    monkeypatch.setattr(crop_search_index, "refresh", lambda: started.append(real_refresh()))
+    try:
+        # cold: answered by the SQL fallback while the index builds off-request
+        r = client.get("/crops", params={"q": "سمسم"})
+        assert [c["id"] for c in r.json()["items"]] == [sesame.id]
+        started[0].join(5)
+        assert crop_search_index.ready
+
+        r = client.get("/crops", params={"q": "سمسم", "limit": 5})
+        assert [c["id"] for c in r.json()["items"]] == [sesame.id]
+        assert started[1] is None  # fresh: no second rebuild
+    finally:
+        crop_search_index.clear()
+
+
+def test_stale_index_text_is_rechecked_in_sql(client, db, monkeypatch):
+    seller = User(name="S", phone="+249933333333", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    sesame = _crop(db, seller, "سمسم")
+
+    monkeypatch.setattr(settings, "search_index_enabled", True)
+    crop_search_index.rebuild(db)
+    try:
+        sesame.name = "فول سوداني"  # edited after the snapshot
+        db.commit()
+        assert crop_search_index.candidates("سمسم") == {sesame.id}
+        r = client.get("/crops", params={"q": "سمسم"})
+        assert r.json()["items"] == []
+    finally:
+        crop_search_index.clear()
+
+
+def test_index_keeps_postgres_full_text_matches(db, monkeypatch):
+    from types import SimpleNamespace
+
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.orm import Query
+
+    from app.repositories.crops import CropFilters, apply_filters
+    from app.utils.text import normalize_ar
+
+    seller = User(name="S", phone="+249944444444", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    _crop(db, seller, "سمسم أبيض")
+
+    monkeypatch.setattr(settings, "search_index_enabled", True)
+    crop_search_index.rebuild(db)
+    try:
+        q = normalize_ar("أبيض سمسم")  # reordered: a full-text match, not a substring
+        assert crop_search_index.candidates(q) == set()
+        pg = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=postgresql.dialect()))
+        sql = str(apply_filters(pg, Query(Crop), CropFilters(q=q)).statement.compile(dialect=postgresql.dialect()))
+        where = sql.split("WHERE", 1)[1]
+        assert "@@ plainto_tsquery" in where
+        assert "false" not in where
+    finally:
+        crop_search_index.clear()
@@ -0,0 +1,56 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import orjson
+
+from app.models import Crop, Media, User
+from app.utils.serializers import CropSerializer, render_json, serialize_crop
+
+
+def _crop(i: int) -> Crop:
+    c = Crop(
+        id=i, name=f"سمسم {i}", type="حبوب", qty=10.0, price=2500.5, unit="kg", seller_id=1,
+        lat=15.6, lng=32.5, state="Khartoum", locality="Bahri", address=None, notes="n",
+        created_at=datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc),
+    )
+    c.seller = User(id=1, name="Seller", phone="+249900000001")
+    c.media = [
+        Media(id=i * 10 + k, path=f"uploads/{i}_{k}.jpg", is_main=(k == 1)) for k in range(3)
+    ]
+    return c
+
+
+def test_fast_serializer_matches_serialize_crop():
+    request = SimpleNamespace(base_url="http://testserver/")
+    crops = [_crop(i) for i in range(1, 4)]
+    crops.append(Crop(id=9, name="bare", qty=1.0, price=1.0, unit="kg", seller_id=1, created_at=None))
+    crops[-1].media = []
+
+    fast = CropSerializer(request).many(crops)
+    assert fast == [serialize_crop(c, request) for c in crops]
+    assert fast[0]["image_url"] == "http://testserver/static/uploads/1_1.jpg"
+
+    decoded = orjson.loads(render_json(fast))
+    assert decoded[0]["created_at"] == "2025-01-01T12:00:00+00:00"
+
+
+def test_thumb_url_and_srcset_from_variants():
+    request = SimpleNamespace(base_url="http://testserver/")
+    crop = _crop(1)
+    crop.media[1].variants = [
+        {"w": 160, "h": 107, "webp": "k_160.webp", "jpeg": "k_160.jpg"},
+        {"w": 1200, "h": 800, "webp": "k_1200.webp", "jpeg": "k.jpg"},
+    ]
+    legacy = _crop(2)  # stored before derivatives: thumb falls back to the main image
+
+    fast = CropSerializer(request).many([crop, legacy])
+    assert fast == [serialize_crop(c, request) for c in (crop, legacy)]
+    assert fast[0]["thumb_url"] == "http://testserver/static/k_160.webp"
+    assert fast[0]["srcset"] == {
+        "webp": "http://testserver/static/k_160.webp 160w, http://testserver/static/k_1200.webp 1200w",
+        "jpeg": "http://testserver/static/k_160.jpg 160w, http://testserver/static/k.jpg 1200w",
+    }
+    assert fast[1]["thumb_url"] == fast[1]["image_url"] and fast[1]["srcset"] is None
+
+    card = CropSerializer(request, ("id", "thumb_url")).one(crop, main=crop.media[1])
+    assert card == {"id": 1, "thumb_url": "http://testserver/static/k_160.webp"}
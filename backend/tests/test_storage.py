@@ -0,0 +1,166 @@
+import io
+
+import pytest
+from PIL import Image
+
+from app.core import storage
+from app.core.config import settings
+from app.models import Crop, Role, User
+from app.models.media import Media, MediaBlob
+from app.services import image_pipeline, media_ingest
+
+
+def _jpeg(color=(0, 128, 0), size=(600, 400)):
+    buf = io.BytesIO()
+    Image.new("RGB", size, color=color).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    backend = storage.LocalStorageBackend(str(tmp_path / "uploads"), "/static")
+    monkeypatch.setattr(storage, "media_storage", backend)
+    monkeypatch.setattr(settings, "image_workers", 0)  # threads; no process pool in tests
+    return backend
+
+
+@pytest.fixture
+def crop(db):
+    seller = User(name="Seller", phone="+249940000002", role=Role.seller)
+    db.add(seller)
+    db.commit()
+    crop = Crop(name="Tomato", type="veg", qty=1, price=1, unit="kg", seller_id=seller.id, lat=0, lng=0)
+    db.add(crop)
+    db.commit()
+    return crop
+
+
+def _files(root):
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*") if p.is_file())
+
+
+def test_local_backend_put_url_delete(tmp_path):
+    backend = storage.LocalStorageBackend(str(tmp_path), "/static/")
+    backend.put_many([("media/ab/x.jpg", b"jpeg", "image/jpeg")])
+    assert (tmp_path / "media/ab/x.jpg").read_bytes() == b"jpeg"
+    assert backend.url("media/ab/x.jpg") == "/static/media/ab/x.jpg"
+    with pytest.raises(ValueError):
+        backend.put_many([("../escape.jpg", b"x", "image/jpeg")])
+    backend.delete(["media/ab/x.jpg", "missing.jpg"])
+    assert _files(tmp_path) == []
+
+
+def test_same_bytes_stored_once_and_deleted_with_last_reference(client, db, crop, local_storage, monkeypatch):
+    calls = []
+    real = image_pipeline.process_image
+
+    async def counting(source):
+        calls.append(source)
+        return await real(source)
+
+    monkeypatch.setattr(image_pipeline, "process_image", counting)
+    photo = _jpeg()
+    ids = []
+    for _ in range(2):
+        r = client.post("/media/upload", data={"crop_id": crop.id}, files={"file": ("a.jpg", photo, "image/jpeg")})
+        assert r.status_code == 200, r.text
+        ids.append(r.json()["id"])
+
+    assert len(calls) == 1  # the re-upload skipped processing
+    blob = db.query(MediaBlob).one()
+    assert blob.refcount == 2
+    assert {m.path for m in db.query(Media)} == {blob.path}
+    assert blob.path.startswith(f"media/{blob.hash[:2]}/{blob.hash}")
+    stored = _files(local_storage.root)
+    assert len(stored) == 6  # 160, 480 and 600px, WebP + JPEG each
+    assert r.json()["url"] == f"/static/{blob.path}"
+
+    assert client.delete(f"/media/{ids[0]}").status_code == 200
+    db.expire_all()
+    assert db.get(MediaBlob, blob.hash).refcount == 1
+    assert _files(local_storage.root) == stored
+
+    assert client.delete(f"/media/{ids[1]}").status_code == 200
+    db.expire_all()
+    assert db.query(MediaBlob).count() == 0
+    assert _files(local_storage.root) == []
+
+
+def test_different_bytes_get_separate_blobs(client, db, crop, local_storage):
+    for color in ((255, 0, 0), (0, 0, 255)):
+        r = client.post(
+            "/media/upload",
+            data={"crop_id": crop.id},
+            files={"file": ("a.jpg", _jpeg(color), "image/jpeg")},
+        )
+        assert r.status_code == 200, r.text
+    assert [b.refcount for b in db.query(MediaBlob)] == [1, 1]
+
+
+def test_crop_upload_form_shares_blobs(client, db, auth_headers, local_storage):
+    photo = _jpeg()
+    r = client.post(
+        "/crops/upload",
+        data={"name": "Okra", "type": "veg", "qty": 3, "price": 2, "unit": "kg", "location.lat": 15.5, "location.lng": 32.5},
+        files=[("images", ("a.jpg", photo, "image/jpeg")), ("images", ("b.jpg", photo, "image/jpeg"))],
+        headers=auth_headers,
+    )
+    assert r.status_code == 201, r.text
+    blob = db.query(MediaBlob).one()
+    assert blob.refcount == 2
+    assert [m.is_main for m in db.query(Media).order_by(Media.id)] == [True, False]
+    assert r.json()["image_url"].endswith(f"/static/{blob.path}")
+
+
+def test_reupload_after_release_gets_fresh_keys(client, db, crop, local_storage):
+    photo = _jpeg()
+    first = client.post("/media/upload", data={"crop_id": crop.id}, files={"file": ("a.jpg", photo, "image/jpeg")})
+    old_path = db.query(MediaBlob).one().path
+    assert client.delete(f"/media/{first.json()['id']}").status_code == 200
+
+    client.post("/media/upload", data={"crop_id": crop.id}, files={"file": ("a.jpg", photo, "image/jpeg")})
+    new_path = db.query(MediaBlob).one().path
+    # a purge still in flight for the released blob can't touch the new objects
+    assert new_path != old_path
+    assert not (local_storage.root / old_path).exists()
+    assert (local_storage.root / new_path).exists()
+
+
+def test_crop_cascade_releases_blob_references(client, db, crop, local_storage):
+    photo = _jpeg()
+    for _ in range(2):
+        client.post("/media/upload", data={"crop_id": crop.id}, files={"file": ("a.jpg", photo, "image/jpeg")})
+    assert db.query(MediaBlob).one().refcount == 2
+
+    db.delete(crop)
+    db.commit()
+    assert db.query(Media).count() == 0
+    assert db.query(MediaBlob).count() == 0
+    assert _files(local_storage.root) == []
+
+
+def test_crop_upload_rejected_image_drops_listing_and_references(client, db, auth_headers, local_storage):
+    r = client.post(
+        "/crops/upload",
+        data={"name": "Okra", "type": "veg", "qty": 3, "price": 2, "unit": "kg", "location.lat": 15.5, "location.lng": 32.5},
+        files=[("images", ("a.jpg", _jpeg(), "image/jpeg")), ("images", ("b.jpg", b"not an image", "image/jpeg"))],
+        headers=auth_headers,
+    )
+    assert r.status_code == 400, r.text
+    db.expire_all()
+    assert db.query(Crop).count() == 0
+    assert db.query(Media).count() == 0
+    assert db.query(MediaBlob).count() == 0
+    assert _files(local_storage.root) == []
+
+
+def test_stored_objects_removed_when_blob_row_never_commits(client, db, crop, local_storage, monkeypatch):
+    def boom(*args, **kwargs):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(media_ingest, "create_media_record", boom)
+    with pytest.raises(RuntimeError):
+        client.post("/media/upload", data={"crop_id": crop.id}, files={"file": ("a.jpg", _jpeg(), "image/jpeg")})
+    db.close()  # what get_db does once the request fails
+    assert db.query(MediaBlob).count() == 0
+    assert _files(local_storage.root) == []
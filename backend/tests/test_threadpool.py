@@ -0,0 +1,48 @@
+import anyio
+import anyio.to_thread
+from prometheus_client import REGISTRY
+
+from app.core import threadpool
+from app.core.config import settings
+
+
+def test_default_limiter_sized_with_db_pool(client, monkeypatch):
+    monkeypatch.setattr(settings, "threadpool_size", 0)
+    assert threadpool.default_threadpool_size() == (
+        settings.db_pool_size + settings.db_max_overflow + settings.threadpool_headroom
+    )
+    monkeypatch.setattr(settings, "threadpool_size", 12)
+    assert threadpool.default_threadpool_size() == 12
+
+    # the app's startup hook applied the size to the running loop's limiter
+    monkeypatch.setattr(settings, "metrics_token", "t")
+    r = client.get("/metrics", headers={"Authorization": "Bearer t"})
+    assert 'threadpool_size{pool="io"} %s' % float(settings.upload_threadpool_size) in r.text
+    assert 'threadpool_waiting{pool="default"}' in r.text
+
+
+def test_run_io_uses_its_own_limiter(monkeypatch):
+    monkeypatch.setattr(settings, "upload_threadpool_size", 1)
+
+    async def main():
+        threadpool.configure_threadpools()
+        started = anyio.Event()
+        release = anyio.Event()
+        waiting = []
+
+        def block():
+            anyio.from_thread.run_sync(started.set)
+            anyio.from_thread.run(release.wait)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(threadpool.run_io, block)
+            await started.wait()
+            tg.start_soon(threadpool.run_io, lambda: None)
+            await anyio.sleep(0.05)
+            waiting.append(REGISTRY.get_sample_value("threadpool_waiting", {"pool": "io"}))
+            # the default limiter (sync handlers) is unaffected
+            assert await anyio.to_thread.run_sync(lambda: 42) == 42
+            release.set()
+        return waiting
+
+    assert anyio.run(main) == [1.0]
@@ -51,6 +51,15 @@ class CropsRepo {
     return Crop.fromJson(res.data as Map<String, dynamic>);
   }
 
+  // --- Cards for many ids in one request (favorites, chats, orders);
+  // order follows `ids`, unknown ids are skipped.
+  Future<List<Crop>> getMany(List<int> ids) async {
+    if (ids.isEmpty) return const [];
+    final res = await _dio.post('/crops/batch', data: {'ids': ids});
+    final items = (res.data as Map<String, dynamic>)['items'] as List;
+    return items.map((e) => Crop.fromJson(e as Map<String, dynamic>)).toList();
+  }
+
   Future<Crop> createJson({
     required String name,
     required String type,
@@ -17,6 +17,9 @@ class Crop {
   final String? sellerPhone;
 
   final String? imageUrl;
+  final String? thumbUrl;
+  /// WebP derivatives by width (from `srcset`), smallest first.
+  final List<MapEntry<int, String>> variants;
   final List<String> images;
   final bool isNew;
 
@@ -33,6 +36,8 @@ class Crop {
     this.sellerName,
     this.sellerPhone,
     this.imageUrl,
+    this.thumbUrl,
+    this.variants = const [],
     this.images = const [],
     this.isNew = false,
   });
@@ -43,6 +48,30 @@ class Crop {
     return fb;
   }
 
+  /// Smallest derivative at least [px] physical pixels wide; falls back to
+  /// the largest one, then to [imageUrl].
+  String? imageForWidth(double px) {
+    if (variants.isEmpty) return imageUrl;
+    for (final v in variants) {
+      if (v.key >= px) return v.value;
+    }
+    return variants.last.value;
+  }
+
+  // "url 160w, url 480w" -> [(160, url), (480, url)]
+  static List<MapEntry<int, String>> _parseSrcset(dynamic srcset) {
+    if (srcset is! Map || srcset['webp'] is! String) return const [];
+    final out = <MapEntry<int, String>>[];
+    for (final part in (srcset['webp'] as String).split(',')) {
+      final bits = part.trim().split(' ');
+      if (bits.length != 2 || !bits[1].endsWith('w')) continue;
+      final w = int.tryParse(bits[1].substring(0, bits[1].length - 1));
+      if (w != null) out.add(MapEntry(w, ensureAbsoluteUrl(bits[0])));
+    }
+    out.sort((a, b) => a.key.compareTo(b.key));
+    return out;
+  }
+
   factory Crop.fromJson(Map<String, dynamic> j) {
     final loc = (j['location'] as Map<String, dynamic>?) ?? const {};
     String? main;
@@ -97,6 +126,8 @@ class Crop {
       sellerName: j['seller_name'] as String?,     // ← يقرأ snake_case
       sellerPhone: j['seller_phone'] as String?,   // ← يقرأ snake_case
       imageUrl: main,
+      thumbUrl: j['thumb_url'] is String ? ensureAbsoluteUrl(j['thumb_url'] as String) : null,
+      variants: _parseSrcset(j['srcset']),
       images: gallery,
       location: location,
       isNew: j['is_new'] == true || j['isNew'] == true,
@@ -120,6 +151,9 @@ class Crop {
         'seller_phone': sellerPhone,
         'notes': notes,
         'image_url': imageUrl,
+        'thumb_url': thumbUrl,
+        if (variants.isNotEmpty)
+          'srcset': {'webp': variants.map((v) => '${v.value} ${v.key}w').join(', ')},
         'images': images,
         'is_new': isNew,
       };
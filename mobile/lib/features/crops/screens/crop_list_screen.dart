@@ -866,7 +866,7 @@ class _CropCardStyle extends ConsumerWidget {
     final favState = ref.watch(favouritesControllerProvider);
     final bool isFav = favState.favoritedCropIdsDefault.contains(crop.id);
 
-    final String? imageUrl = crop.imageUrl;
+    final String? imageUrl = crop.imageForWidth(300 * MediaQuery.of(context).devicePixelRatio);
     final String title = crop.name.isNotEmpty ? crop.name : 'بدون عنوان';
     final String priceText = crop.price > 0 ? '${crop.price.toStringAsFixed(0)} جنيه' : '—';
     final String qtyText = (crop.qty > 0 ? crop.qty.toStringAsFixed(crop.qty % 1 == 0 ? 0 : 2) : '—') +
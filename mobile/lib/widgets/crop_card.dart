@@ -81,12 +81,13 @@ class _CropCardState extends State<CropCard>
     ];
     final locationText = locationParts.join('، ');
 
-    // thumb url (prefer main image, fallback to first)
-    final String? thumbUrl =
-        crop.imageUrl ?? (crop.images.isNotEmpty ? crop.images.first : null);
-
     final dpr = MediaQuery.of(context).devicePixelRatio;
 
+    // thumb url: the smallest derivative covering the card, else the main
+    // image, else the first one
+    final String? thumbUrl = crop.imageForWidth(300 * dpr) ??
+        (crop.images.isNotEmpty ? crop.images.first : null);
+
     return AnimatedBuilder(
       animation: _animationController,
       builder: (context, child) {